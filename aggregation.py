@@ -0,0 +1,370 @@
+import sqlite3
+from itertools import chain
+import numpy as np
+import pandas as pd
+from records import AnalysisResult, ProcessedArticle
+from sentiment import SentimentCategory
+
+SENTIMENT_LABELS = ["Positive", "Negative", "Neutral"]
+SCORE_COLUMNS = ["polarity", "compound"]
+
+_SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+
+# Separates topics packed into one string by the history query
+_TOPIC_SEPARATOR = "\x1f"
+
+
+def articles_frame(results):
+    """
+    Flatten analysis results into one row per article
+
+    Parameters:
+    results (dict or list): processed_data dicts or AnalysisResult records, either
+    keyed by company name as returned by process_news_batch, or as a list
+
+    Returns:
+    pandas.DataFrame: Columns company, position (rank in the results), sentiment,
+    polarity, compound and topics. Missing scores are NaN.
+    """
+    if isinstance(results, dict):
+        results = results.values()
+    company_names, company_articles = [], []
+    for processed_data in results:
+        if isinstance(processed_data, AnalysisResult):
+            company_names.append(processed_data.company)
+            company_articles.append(processed_data.articles)
+        else:
+            company_names.append(processed_data["Company"])
+            company_articles.append([ProcessedArticle.from_dict(article) for article in processed_data["Articles"]])
+
+    lengths = np.fromiter(map(len, company_articles), dtype=np.int64, count=len(company_articles))
+    articles = list(chain.from_iterable(company_articles))
+    # One category per company, repeated for its articles
+    companies = pd.Categorical(company_names)
+    # Unknown labels get code -1, which pandas shows as a missing value
+    sentiment_codes = np.fromiter(
+        (_SENTIMENT_CODES.get(article.sentiment, -1) for article in articles), dtype=np.int8, count=len(articles)
+    )
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    return pd.DataFrame({
+        "company": pd.Categorical.from_codes(np.repeat(companies.codes, lengths), dtype=companies.dtype),
+        "position": (np.arange(len(articles)) - starts).astype(np.int32),
+        "sentiment": pd.Categorical.from_codes(sentiment_codes, categories=SENTIMENT_LABELS),
+        # None becomes NaN, which every aggregate below skips
+        "polarity": np.array([article.polarity for article in articles], dtype=np.float64),
+        "compound": np.array([article.compound for article in articles], dtype=np.float64),
+        "topics": [article.topics for article in articles],
+    })
+
+
+def topics_frame(frame):
+    """
+    Explode the topics column into one row per (article, topic) pair
+
+    Topics are factorized here, once, so that several topic aggregates over
+    the same frame can share the work.
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with a topics column holding a list per article
+
+    Returns:
+    pandas.DataFrame: Columns row (position of the article in frame) and topic
+    (categorical, with the topics as sorted categories)
+    """
+    topics = frame["topics"].to_numpy()
+    lengths = np.fromiter(map(len, topics), dtype=np.int64, count=len(topics))
+    codes, names = pd.factorize(
+        np.fromiter(chain.from_iterable(topics), dtype=object, count=int(lengths.sum())), sort=True
+    )
+    return pd.DataFrame({
+        "row": np.repeat(np.arange(len(frame)), lengths),
+        "topic": pd.Categorical.from_codes(codes, categories=names),
+    })
+
+
+def history_frame(store, since=None, until=None, with_topics=True):
+    """
+    Load recorded articles from the history store into one row per article
+
+    Parameters:
+    store (history.HistoryStore): Store to read from
+    since (float, optional): Unix time to start from
+    until (float, optional): Unix time to stop at
+    with_topics (bool): Whether to load the topics column, which about doubles the load time
+
+    Returns:
+    pandas.DataFrame: Columns company, fetched_at, sentiment, polarity and compound, plus topics if requested
+    """
+    columns = "a.company_key AS company, a.fetched_at, a.sentiment, a.polarity, a.compound"
+    params = []
+    if with_topics:
+        columns += ", (SELECT group_concat(topic, ?) FROM article_topics WHERE article_id = a.id) AS topics"
+        params.append(_TOPIC_SEPARATOR)
+    query = f"SELECT {columns} FROM articles a WHERE a.fetched_at >= ?"
+    params.append(since if since is not None else 0)
+    if until is not None:
+        query += " AND a.fetched_at < ?"
+        params.append(until)
+
+    with sqlite3.connect(store.path) as connection:
+        frame = pd.read_sql_query(query, connection, params=params)
+
+    frame["company"] = frame["company"].astype("category")
+    frame["sentiment"] = pd.Categorical(frame["sentiment"], categories=SENTIMENT_LABELS)
+    if with_topics:
+        frame["topics"] = [
+            # Articles without topics come back as NULL, which pandas may turn into NaN
+            packed.split(_TOPIC_SEPARATOR) if isinstance(packed, str) else [] for packed in frame["topics"]
+        ]
+    return frame
+
+
+def _groups(frame, by):
+    """
+    Number the groups of a frame, for reductions with np.bincount
+
+    Parameters:
+    frame (pandas.DataFrame): Frame to group
+    by (str or list): Column(s) to group by
+
+    Returns:
+    tuple: (group number per row, -1 for rows with a missing key; pandas.Index of the sorted group keys)
+    """
+    grouped = frame.groupby(by, observed=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index
+
+
+def _group_sums(ids, groups, values):
+    """Sum values per group, skipping rows that are not in a group"""
+    member = ids >= 0
+    return np.bincount(ids[member], weights=values[member], minlength=groups)
+
+
+def rank_weights(frame):
+    """
+    Weights that favor the top results, 1 / (1 + position)
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with a position column
+
+    Returns:
+    numpy.ndarray: One weight per row
+    """
+    return 1.0 / (1.0 + frame["position"].to_numpy(dtype=np.float64))
+
+
+def _label_counts(frame, ids, groups):
+    """Count articles per (group, sentiment label), as a groups x labels array"""
+    labels = len(SENTIMENT_LABELS)
+    codes = frame["sentiment"].cat.codes.to_numpy()
+    counted = (ids >= 0) & (codes >= 0)
+    # One bin per (group, label) pair
+    counts = np.bincount(ids[counted] * labels + codes[counted], minlength=groups * labels)
+    return counts.reshape(groups, labels)
+
+
+def _means(frame, weights, ids, groups):
+    """Weighted mean of each score column per group, see weighted_means"""
+    if weights is None:
+        weights = np.ones(len(frame))
+    elif isinstance(weights, str):
+        weights = frame[weights].to_numpy(dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    scores = frame[SCORE_COLUMNS].to_numpy(dtype=np.float64)
+    present = ~np.isnan(scores)
+    # Divide the sum of weight * score by the weight of the rows that have a score, per group
+    means = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i, column in enumerate(SCORE_COLUMNS):
+            weighted = _group_sums(ids, groups, np.where(present[:, i], scores[:, i] * weights, 0.0))
+            weight = _group_sums(ids, groups, np.where(present[:, i], weights, 0.0))
+            means[column] = weighted / np.where(weight == 0.0, np.nan, weight)
+    return means
+
+
+def sentiment_distribution(frame, by="company"):
+    """
+    Count articles per sentiment label
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with a sentiment column
+    by (str or list): Column(s) to group by
+
+    Returns:
+    pandas.DataFrame: One row per group with Positive, Negative and Neutral counts and their shares
+    """
+    ids, index = _groups(frame, by)
+    counts = _label_counts(frame, ids, len(index))
+    shares = counts / np.maximum(counts.sum(axis=1), 1)[:, None]
+
+    distribution = pd.DataFrame(counts, index=index, columns=list(SENTIMENT_LABELS))
+    for i, label in enumerate(SENTIMENT_LABELS):
+        distribution[f"{label} Share"] = shares[:, i]
+    return distribution
+
+
+def weighted_means(frame, weights=None, by="company"):
+    """
+    Weighted mean polarity and compound score per group
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with polarity and compound columns
+    weights (array-like or str, optional): Per-row weights, or the name of a weight column.
+    Defaults to equal weights.
+    by (str or list): Column(s) to group by
+
+    Returns:
+    pandas.DataFrame: One row per group with polarity and compound means. Rows
+    without a score do not count towards that score's weight.
+    """
+    ids, index = _groups(frame, by)
+    return pd.DataFrame(_means(frame, weights, ids, len(index)), index=index)
+
+
+def summarize(frame, weights=None, by="company"):
+    """
+    Per-group counterpart of determine_sentiment_verdict, computed for every group at once
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with sentiment, polarity and compound columns
+    weights (array-like or str, optional): Weights for the weighted means, see weighted_means
+    by (str or list): Column(s) to group by
+
+    Returns:
+    pandas.DataFrame: One row per group with label counts, "Net Sentiment",
+    "Mean Polarity", "Mean Compound", "Weighted Polarity", "Weighted Compound"
+    and the "Category" (a SentimentCategory value)
+    """
+    # Group once and build the frame in one go, inserting columns one by one costs more than the sums
+    ids, index = _groups(frame, by)
+    counts = _label_counts(frame, ids, len(index))
+    positive, negative, neutral = counts.T
+    total = positive + negative + neutral
+
+    means = _means(frame, None, ids, len(index))
+    weighted = _means(frame, weights, ids, len(index))
+
+    columns = {label: counts[:, i] for i, label in enumerate(SENTIMENT_LABELS)}
+    columns["Net Sentiment"] = (positive - negative) / np.maximum(total, 1)
+    columns["Mean Polarity"] = means["polarity"]
+    columns["Mean Compound"] = means["compound"]
+    columns["Weighted Polarity"] = weighted["polarity"]
+    columns["Weighted Compound"] = weighted["compound"]
+    # Same rules, in the same order, as determine_sentiment_verdict
+    columns["Category"] = np.select(
+        [
+            positive > negative + neutral,
+            negative > positive + neutral,
+            positive > negative,
+            negative > positive,
+        ],
+        [
+            SentimentCategory.PREDOMINANTLY_POSITIVE.value,
+            SentimentCategory.SIGNIFICANT_CONCERNS.value,
+            SentimentCategory.CAUTIOUSLY_POSITIVE.value,
+            SentimentCategory.LEANS_NEGATIVE.value,
+        ],
+        default=SentimentCategory.MIXED_NEUTRAL.value,
+    )
+    return pd.DataFrame(columns, index=index)
+
+
+def topic_sentiment(frame, by="company", topics=None):
+    """
+    Coverage and mean scores per topic
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with a topics column holding a list per article
+    by (str or list): Column(s) to group by besides the topic
+    topics (pandas.DataFrame, optional): topics_frame(frame), to reuse it across calls
+
+    Returns:
+    pandas.DataFrame: One row per group and topic with the article count, mean polarity and
+    mean compound, most covered topics first within each group
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    ids, index = _groups(frame, by)
+    if topics is None:
+        topics = topics_frame(frame)
+
+    rows = topics["row"].to_numpy()
+    topic_names = topics["topic"].cat.categories
+    topic_codes = topics["topic"].cat.codes.to_numpy()
+    member = ids[rows] >= 0
+    rows, topic_codes = rows[member], topic_codes[member]
+
+    # Number the (group, topic) pairs in group, then topic, order
+    keys = ids[rows] * len(topic_names) + topic_codes
+    if len(index) * len(topic_names) <= 4 * len(keys) + 1024:
+        # Few enough pairs to count in one bin each, which is cheaper than sorting the keys
+        present = np.bincount(keys, minlength=len(index) * len(topic_names))
+        pairs = np.flatnonzero(present)
+        numbers = np.empty(len(present), dtype=np.int64)
+        numbers[pairs] = np.arange(len(pairs))
+        pair_ids = numbers[keys]
+    else:
+        pairs, pair_ids = np.unique(keys, return_inverse=True)
+    articles = np.bincount(pair_ids, minlength=len(pairs))
+    columns = {"articles": articles}
+    scores = frame[SCORE_COLUMNS].to_numpy(dtype=np.float64)[rows]
+    present = ~np.isnan(scores)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i, column in enumerate(SCORE_COLUMNS):
+            total = np.bincount(pair_ids, weights=np.where(present[:, i], scores[:, i], 0.0), minlength=len(pairs))
+            count = np.bincount(pair_ids, weights=present[:, i], minlength=len(pairs))
+            columns[column] = total / np.where(count == 0, np.nan, count)
+
+    group_numbers, topic_numbers = np.divmod(pairs, len(topic_names))
+    group_keys = index.take(group_numbers)
+    levels = [group_keys.get_level_values(i) for i in range(group_keys.nlevels)] + [topic_names.take(topic_numbers)]
+    result = pd.DataFrame(columns, index=pd.MultiIndex.from_arrays(levels, names=by + ["topic"]))
+    # Most covered topics first within each group; lexsort is stable, so ties stay in topic order
+    return result.iloc[np.lexsort((-articles, group_numbers))]
+
+
+def rolling_sentiment(frame, window="7D", freq="1D", by="company"):
+    """
+    Rolling mean scores over time
+
+    Articles are first summed into freq buckets, then each bucket's value is
+    the mean over all articles in the preceding window, so busy days weigh
+    more than quiet ones.
+
+    Parameters:
+    frame (pandas.DataFrame): Frame with fetched_at (Unix time), polarity and compound columns
+    window (str): Rolling window length, a pandas offset such as "7D"
+    freq (str): Bucket size, a pandas offset such as "1D" or "1h"
+    by (str): Column to group by
+
+    Returns:
+    pandas.DataFrame: Indexed by group and bucket start, with articles, polarity and compound
+    """
+    scores = frame[SCORE_COLUMNS].to_numpy(dtype=np.float64)
+    present = ~np.isnan(scores)
+    data = pd.DataFrame({
+        by: frame[by].to_numpy(),
+        "time": pd.to_datetime(frame["fetched_at"].to_numpy(), unit="s"),
+        "articles": np.ones(len(frame), dtype=np.int64),
+        "polarity": np.where(present[:, 0], scores[:, 0], 0.0),
+        "compound": np.where(present[:, 1], scores[:, 1], 0.0),
+        "polarity_count": present[:, 0].astype(np.int64),
+        "compound_count": present[:, 1].astype(np.int64),
+    })
+
+    buckets = data.groupby([by, pd.Grouper(key="time", freq=freq)], observed=True).sum()
+    rolled = (
+        buckets.reset_index(level=0)
+        .groupby(by, observed=True, group_keys=True)
+        .rolling(window)
+        .sum()
+        .drop(columns=by, errors="ignore")
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "articles": rolled["articles"].astype(np.int64),
+            "polarity": rolled["polarity"] / rolled["polarity_count"].replace(0, np.nan),
+            "compound": rolled["compound"] / rolled["compound_count"].replace(0, np.nan),
+        })
@@ -1,7 +1,6 @@
 import requests
 import streamlit as st
-import os
-import base64
+from utils import fetch_audio
 
 def call_api(endpoint, data):
     """
@@ -25,27 +24,19 @@ def call_api(endpoint, data):
         st.error(f"API Error: {str(e)}")
         return None
 
-def get_audio_data(audio_file_path):
+def get_audio_data(api_url, audio_id):
     """
-    Get base64 encoded audio data from file
+    Get generated audio by ID from the API
     
     Parameters:
-    audio_file_path (str): Path to audio file
+    api_url (str): API endpoint URL
+    audio_id (str): Audio ID returned by the /api/audio endpoint
     
     Returns:
-    str: Base64 encoded audio data
+    bytes: MP3 audio data
     """
-    try:
-        # Check if file exists
-        if not os.path.exists(audio_file_path):
-            st.error(f"Audio file not found: {audio_file_path}")
-            return None
-            
-        # Read and encode audio file
-        with open(audio_file_path, "rb") as audio_file:
-            audio_bytes = audio_file.read()
-            audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
-            return audio_base64
-    except Exception as e:
-        st.error(f"Error loading audio: {str(e)}")
-        return None
\ No newline at end of file
+    success, audio = fetch_audio(api_url, audio_id)
+    if not success:
+        st.error(f"Error loading audio: {audio}")
+        return None
+    return audio
\ No newline at end of file
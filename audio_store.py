@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Where synthesized audio is kept and how much disk it may use
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "news_audio")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Temporary files older than this were left behind by a synthesis that died and are deleted on eviction
+STALE_TEMP_SECONDS = 600
+
+
+def audio_key(text, language_code, voice_settings=None):
+    """
+    Stable content hash identifying a piece of synthesized audio
+
+    Parameters:
+    text (str): Text that is spoken
+    language_code (str): Language code
+    voice_settings (dict, optional): Engine options that change the output
+
+    Returns:
+    str: Hex digest that is the same across processes and restarts
+    """
+    payload = json.dumps(
+        {"text": text, "language": language_code, "voice": voice_settings or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """A synthesis in progress that other callers for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+class AudioStore:
+    """
+    Content-addressed directory of MP3 files with size-bounded eviction.
+
+    Files are written to a temporary name and renamed into place, so readers
+    never see partial audio. Concurrent requests for the same key inside one
+    process share a single synthesis.
+    """
+
+    def __init__(self, directory=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        """
+        Parameters:
+        directory (str): Directory the audio files are stored in
+        max_bytes (int): Total size the stored files may use before the least recently used are removed
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._flights = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """Path the audio for a key is stored at"""
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key):
+        """
+        Look up stored audio
+
+        Parameters:
+        key (str): Audio key from audio_key()
+
+        Returns:
+        str: Path to the audio file, or None if it has not been synthesized
+        """
+        path = self.path(key)
+        try:
+            # Refresh the modification time, which eviction uses as the recency order
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def get_or_create(self, key, synthesize):
+        """
+        Return stored audio, synthesizing it once if it is missing
+
+        Parameters:
+        key (str): Audio key from audio_key()
+        synthesize (callable): Function that writes the audio to the path it is given
+
+        Returns:
+        str: Path to the audio file
+        """
+        while True:
+            path = self.get(key)
+            if path is not None:
+                return path
+
+            with self._lock:
+                flight = self._flights.get(key)
+                owner = flight is None
+                if owner:
+                    flight = _Flight()
+                    self._flights[key] = flight
+
+            if not owner:
+                # Someone else is already synthesizing this audio
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                continue
+
+            try:
+                path = self._create(key, synthesize)
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.done.set()
+
+            # The new file is about to be handed out, so it is never the one evicted
+            self.evict(keep=key)
+            return path
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used files until the store fits in max_bytes,
+        and temporary files abandoned by a synthesis that died
+
+        Parameters:
+        keep (str, optional): Key whose file is not removed, even if it is the oldest
+        """
+        now = time.time()
+        keep_name = f"{keep}.mp3" if keep is not None else None
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if stat.st_mtime < now - STALE_TEMP_SECONDS:
+                        self._remove(entry.path)
+                    continue
+                if not entry.name.endswith(".mp3"):
+                    continue
+                total += stat.st_size
+                if entry.name != keep_name:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def _create(self, key, synthesize):
+        path = self.path(key)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", prefix=f"{key}.", dir=self.directory)
+        os.close(fd)
+        try:
+            synthesize(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        return path
+
+
+_audio_store = None
+_audio_store_lock = threading.Lock()
+
+
+def get_audio_store():
+    """Return the process-wide audio store, configured from the environment"""
+    global _audio_store
+    if _audio_store is None:
+        with _audio_store_lock:
+            if _audio_store is None:
+                _audio_store = AudioStore()
+    return _audio_store
@@ -0,0 +1,110 @@
+"""
+Compare the vectorized aggregation in aggregation.py with the per-dict loop
+
+For every company, the loop does what process_news_articles does per request:
+count the labels and call determine_sentiment_verdict, then average the
+scores per topic. The vectorized side builds one frame for all companies and
+its exploded topics, then calls summarize and topic_sentiment.
+
+"first" compares the loop with building the frames plus aggregating, "reuse"
+with aggregating a frame that is already built, as when several aggregates
+or groupings run over one frame or history_frame.
+
+Usage: python benchmarks/bench_aggregation.py [--companies 100,1000,5000] [--articles N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregation  # noqa: E402
+from records import AnalysisResult, ProcessedArticle  # noqa: E402
+from sentiment import determine_sentiment_verdict  # noqa: E402
+
+TOPICS = ["Earnings", "Rockets", "Anvils", "Europe", "Batteries", "Lawsuit", "Hiring", "Guidance"]
+
+
+def build_results(companies, articles, seed=0):
+    """
+    Parameters:
+    companies (int): Number of companies
+    articles (int): Articles per company
+
+    Returns:
+    dict: AnalysisResult records keyed by company name, with random scores and topics
+    """
+    rng = random.Random(seed)
+    results = {}
+    for c in range(companies):
+        processed_articles = []
+        for _ in range(articles):
+            compound = rng.uniform(-1, 1)
+            sentiment = "Positive" if compound > 0.3 else "Negative" if compound < -0.3 else "Neutral"
+            processed_articles.append(
+                ProcessedArticle("", None, "", sentiment, compound / 2, compound, rng.sample(TOPICS, 3))
+            )
+        results[f"Company {c}"] = AnalysisResult(f"Company {c}", processed_articles, {}, "")
+    return results
+
+
+def loop_aggregate(results):
+    verdicts = {}
+    topic_scores = {}
+    for company_name, result in results.items():
+        articles = result.articles
+        counts = Counter({"Positive": 0, "Negative": 0, "Neutral": 0})
+        counts.update(article.sentiment for article in articles)
+        verdicts[company_name] = determine_sentiment_verdict(counts, articles)
+
+        per_topic = defaultdict(list)
+        for article in articles:
+            for topic in article.topics:
+                per_topic[topic].append(article.compound)
+        topic_scores[company_name] = {topic: sum(values) / len(values) for topic, values in per_topic.items()}
+    return verdicts, topic_scores
+
+
+def build_frames(results):
+    frame = aggregation.articles_frame(results)
+    return frame, aggregation.topics_frame(frame)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized against per-dict aggregation")
+    parser.add_argument("--companies", default="100,1000,5000", help="Comma-separated company counts")
+    parser.add_argument("--articles", type=int, default=20, help="Articles per company")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best is kept")
+    args = parser.parse_args()
+
+    print(f"{args.articles} articles per company, best of {args.repeat}, milliseconds\n")
+    print(f"{'companies':>10}{'loop':>10}{'frame':>10}{'aggregate':>11}{'first':>9}{'reuse':>9}")
+    for companies in (int(n) for n in args.companies.split(",")):
+        results = build_results(companies, args.articles)
+        loop_seconds, (verdicts, topic_scores) = best_of(lambda: loop_aggregate(results), args.repeat)
+        frame_seconds, (frame, topics) = best_of(lambda: build_frames(results), args.repeat)
+        aggregate_seconds, (summary, topic_frame) = best_of(
+            lambda: (aggregation.summarize(frame), aggregation.topic_sentiment(frame, topics=topics)), args.repeat
+        )
+        # Both sides must agree before their timings mean anything
+        assert all(summary.loc[name, "Category"] == verdict["Category"] for name, verdict in verdicts.items())
+        assert len(topic_frame) == sum(map(len, topic_scores.values()))
+
+        print(f"{companies:>10}{loop_seconds * 1000:>10.1f}{frame_seconds * 1000:>10.1f}"
+              f"{aggregate_seconds * 1000:>11.1f}{loop_seconds / (frame_seconds + aggregate_seconds):>8.1f}x"
+              f"{loop_seconds / aggregate_seconds:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Time summary translation for every language and sentiment category
+
+Usage: python benchmarks/bench_language.py [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language import (DEFAULT_LANGUAGE, LANGUAGE_CODES, SENTIMENT_CATEGORIES,  # noqa: E402
+                      render_sentiment, translate_sentiment_analysis, translate_summary)
+
+TOPIC = "Electric Vehicles"
+
+
+def build_processed_data(category, structured):
+    """
+    Parameters:
+    category (str): One of SENTIMENT_CATEGORIES
+    structured (bool): Include the "Sentiment Verdict", otherwise only the English prose is available
+
+    Returns:
+    dict: Minimal processed news data accepted by translate_summary
+    """
+    processed_data = {
+        "Company": "Acme",
+        "Articles": [{}] * 10,
+        "Comparative Sentiment Score": {
+            "Sentiment Distribution": {"Positive": 5, "Negative": 3, "Neutral": 2},
+            "Topic Overlap": {"Common Topics": ["Electric Vehicles", "Batteries", "Earnings"]},
+        },
+        "Final Sentiment Analysis": render_sentiment(category, TOPIC, DEFAULT_LANGUAGE),
+    }
+    if structured:
+        processed_data["Sentiment Verdict"] = {"Category": category, "Focus Topic": TOPIC}
+    return processed_data
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summary translation")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    language_codes = [language["code"] for language in LANGUAGE_CODES.values()]
+    print(f"{len(language_codes)} languages x {len(SENTIMENT_CATEGORIES)} categories, "
+          f"microseconds per call (best of 3 x {args.number})\n")
+    print(f"{'language':<10}{'category':<24}{'verdict':>10}{'prose':>10}{'summary':>10}")
+
+    totals = [0.0, 0.0, 0.0]
+    for language_code in language_codes:
+        for category in SENTIMENT_CATEGORIES:
+            english = render_sentiment(category, TOPIC, DEFAULT_LANGUAGE)
+            structured = build_processed_data(category, structured=True)
+            timings = (
+                per_call(lambda: render_sentiment(category, TOPIC, language_code), args.number),
+                per_call(lambda: translate_sentiment_analysis(english, language_code), args.number),
+                per_call(lambda: translate_summary(structured, language_code), args.number),
+            )
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            print(f"{language_code:<10}{category:<24}" + "".join(f"{timing:>10.2f}" for timing in timings))
+
+    cells = len(language_codes) * len(SENTIMENT_CATEGORIES)
+    print(f"\n{'mean':<34}" + "".join(f"{total / cells:>10.2f}" for total in totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the HTML parser backends on a synthetic Bing news results page
+
+Usage: python benchmarks/bench_parsers.py [--cards N] [--repeat N]
+"""
+import argparse
+import importlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsers  # noqa: E402
+
+CARD = (
+    '<div class="news-card newsitem cardcommon" data-author="Source {i}"><div class="caption">'
+    '<a class="title" href="https://example.com/story-{i}" target="_blank">Company headline number {i}</a>'
+    '<div class="snippet">Snippet {i} describing the story in a sentence or two, as Bing shows it.</div>'
+    '</div><div class="source"><a href="https://example.com/source-{i}">Source {i}</a></div></div>'
+)
+
+
+def build_page(cards):
+    """
+    Parameters:
+    cards (int): Number of news cards on the page
+
+    Returns:
+    bytes: UTF-8 encoded results page, padded with unrelated markup like the real one
+    """
+    padding = '<div class="b_scopebar"><ul>' + "<li><a href='#'>Tab</a></li>" * 20 + "</ul></div>"
+    body = "".join(CARD.format(i=i) for i in range(cards))
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'></head><body>{padding * 10}{body}</body></html>".encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTML parser backends")
+    parser.add_argument("--cards", type=int, default=10, help="News cards on the page")
+    parser.add_argument("--repeat", type=int, default=200, help="Parses per backend")
+    args = parser.parse_args()
+
+    page = build_page(args.cards)
+    print(f"Page: {len(page) / 1024:.1f} KiB, {args.cards} cards, {args.repeat} parses per backend\n")
+    print(f"{'backend':<12}{'ms/page':>10}{'pages/s':>10}{'speedup':>10}")
+
+    baseline = None
+    for name in reversed(list(parsers.PARSERS)):  # slowest first, so it is the baseline
+        try:
+            importlib.import_module(parsers._BACKEND_MODULES[name])
+        except ImportError:
+            print(f"{name:<12}{'not installed':>30}")
+            continue
+        parse = parsers.PARSERS[name]
+        assert len(parse(page, args.cards)) == args.cards
+        seconds = min(timeit.repeat(lambda: parse(page, args.cards), number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:<12}{seconds * 1000:>10.3f}{1 / seconds:>10.0f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
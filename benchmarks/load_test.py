@@ -0,0 +1,85 @@
+"""
+Measure how analysis throughput scales with the number of NLP workers
+
+Submits concurrent jobs through executors.WorkerPools, the layer the API uses,
+for increasing worker counts. Every job analyzes its own set of articles, so
+the per-article cache does not hide the work.
+
+Process pool workers load the NLP models when they start, so the models must
+be installed even with --synthetic, which swaps the analysis for pure-Python
+CPU work to show the scaling of the pool itself.
+
+Usage: python benchmarks/load_test.py [--kind process|thread] [--jobs N] [--articles N] [--workers 1,2,4] [--synthetic]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from executors import WorkerPools  # noqa: E402
+
+
+def analyze_job(job, articles):
+    """One /api/news worth of NLP: sentiment and topics for a company's articles"""
+    from sentiment import process_news_articles
+
+    news_articles = [
+        {
+            "Title": f"Job {job} story {i}",
+            "Link": f"https://example.com/{job}/{i}",
+            "Summary": f"Acme shares rose {job}.{i} percent after record deliveries of electric vehicles in Europe, "
+                       f"while analysts in New York warned about battery supply costs (report {job}-{i}).",
+        }
+        for i in range(articles)
+    ]
+    return len(process_news_articles("Acme", news_articles).articles)
+
+
+def synthetic_job(job, articles):
+    """CPU-bound stand-in for analyze_job"""
+    total = 0
+    for i in range(articles * 200_000):
+        total += (i * job) % 7
+    return total
+
+
+async def run(pools, work, jobs, articles):
+    start = time.perf_counter()
+    await asyncio.gather(*(pools.run_nlp(work, job, articles) for job in range(jobs)))
+    return time.perf_counter() - start
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Load test the NLP worker pool")
+    parser.add_argument("--kind", choices=("process", "thread"), default="process", help="NLP executor kind")
+    parser.add_argument("--jobs", type=int, default=4 * cpu_count, help="Concurrent jobs per run")
+    parser.add_argument("--articles", type=int, default=10, help="Articles per job")
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= cpu_count),
+                        help="Comma-separated worker counts to try")
+    parser.add_argument("--synthetic", action="store_true", help="Use pure-Python CPU work instead of the NLP pipeline")
+    args = parser.parse_args()
+
+    work = synthetic_job if args.synthetic else analyze_job
+    print(f"{args.kind} pool, {args.jobs} concurrent jobs of {args.articles} articles, {cpu_count} CPUs\n")
+    print(f"{'workers':>8}{'seconds':>10}{'jobs/s':>10}{'speedup':>10}")
+
+    baseline = None
+    for workers in (int(n) for n in args.workers.split(",")):
+        pools = WorkerPools(io_workers=1, nlp_workers=workers, nlp_executor=args.kind, max_pending=args.jobs,
+                            warm_up_models=not args.synthetic)
+        try:
+            # Start the workers and load the models before timing
+            asyncio.run(run(pools, work, workers, 1))
+            seconds = asyncio.run(run(pools, work, args.jobs, args.articles))
+        finally:
+            pools.shutdown()
+        baseline = baseline or seconds
+        print(f"{workers:>8}{seconds:>10.2f}{args.jobs / seconds:>10.1f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
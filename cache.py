@@ -0,0 +1,294 @@
+import hashlib
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from records import dumps, loads
+
+# Settings for the /api/news result cache
+RESULT_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "300"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("NEWS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_DIR = os.getenv("NEWS_CACHE_DIR") or None
+RESULT_CACHE_MAX_DISK_ENTRIES = int(os.getenv("NEWS_CACHE_MAX_DISK_ENTRIES", "10000"))
+
+# The on-disk backend is swept every this many writes; temporary files older than
+# STALE_TEMP_SECONDS were left behind by a writer that died and are deleted
+DISK_PRUNE_INTERVAL = 100
+STALE_TEMP_SECONDS = 60
+
+# Settings for analysis results kept by ID for /api/audio; on disk under NEWS_CACHE_DIR so every worker sees them
+ANALYSIS_STORE_TTL = float(os.getenv("NEWS_ANALYSIS_TTL", "3600"))
+ANALYSIS_STORE_MAX_BYTES = int(os.getenv("NEWS_ANALYSIS_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def normalize_key(text):
+    """
+    Normalize a cache key so that case and whitespace differences map to the same entry
+
+    Parameters:
+    text (str): Raw key, typically a company name
+
+    Returns:
+    str: Normalized key
+    """
+    return " ".join(text.split()).casefold()
+
+
+class ResultCache:
+    """
+    In-memory LRU cache with a time-to-live and a memory budget, optionally
+    backed by a directory of JSON files so entries survive restarts.
+
+    Values must be JSON serializable. Their serialized size in bytes is what
+    counts against max_bytes. Values are returned as stored, not copied, so
+    callers share them and must treat them as read-only.
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_bytes=RESULT_CACHE_MAX_BYTES, directory=None,
+                 max_disk_entries=RESULT_CACHE_MAX_DISK_ENTRIES):
+        """
+        Parameters:
+        ttl (float, optional): Seconds an entry stays valid. None means entries never expire.
+        max_bytes (int): Upper bound on the serialized size of all in-memory entries
+        directory (str, optional): Directory for the on-disk backend. None keeps the cache in memory only.
+        max_disk_entries (int): Files the on-disk backend keeps; the oldest are deleted beyond that
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._disk_writes = 0
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """
+        Look up a value
+
+        Parameters:
+        key (str): Cache key
+
+        Returns:
+        object: The cached value, shared with other callers and not to be modified, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        # Fall back to the on-disk copy, then promote it into memory
+        value, expires_at = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value, expires_at, len(dumps(value)))
+        return value
+
+    def set(self, key, value, payload=None):
+        """
+        Store a value
+
+        Parameters:
+        key (str): Cache key
+        value (object): JSON serializable value
+        payload (bytes, optional): The value as serialized by records.dumps, when the
+        caller already has it, so a value stored in several caches is encoded once
+        """
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        if payload is None:
+            payload = dumps(value)
+        with self._lock:
+            self._store(key, value, expires_at, len(payload))
+        self._write_disk(key, payload, expires_at)
+
+    def delete(self, key):
+        """Remove a key from memory and disk"""
+        with self._lock:
+            self._remove(key)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Remove every in-memory entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Returns:
+        dict: Hit and miss counters, number of entries and bytes held in memory
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _store(self, key, value, expires_at, size):
+        self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        # Evict least recently used entries until the budget is met
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read_disk(self, key, now):
+        if not self.directory:
+            return None, None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                record = loads(cache_file.read())
+        except (OSError, ValueError):
+            return None, None
+
+        expires_at = record.get("expires_at")
+        if record.get("key") != key:
+            return None, None
+        if expires_at is not None and expires_at <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, None
+        return record.get("value"), expires_at
+
+    def _write_disk(self, key, payload, expires_at):
+        if not self.directory:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # The value is already serialized, so splice it in rather than encoding it again
+        record = b'{"key": ' + dumps(key) + b', "expires_at": ' + dumps(expires_at) + b', "value": ' + payload + b'}'
+        try:
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(record)
+            # Atomic rename so readers never see a half written file
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            # Sweep on the first write, so a restarted worker catches up, and then periodically
+            prune = self._disk_writes % DISK_PRUNE_INTERVAL == 1
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Delete expired entries and abandoned temporary files from the on-disk
+        backend, then the oldest entries until at most max_disk_entries remain
+
+        Entries are aged by file modification time, which is when they were written.
+
+        Returns:
+        int: Number of files deleted
+        """
+        if not self.directory:
+            return 0
+        now = time.time()
+        entries = []
+        stale = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    # Subdirectories, such as another cache's, are left alone
+                    if not entry.is_file():
+                        continue
+                    try:
+                        modified = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if entry.name.endswith(".tmp"):
+                        if modified < now - STALE_TEMP_SECONDS:
+                            stale.append(entry.path)
+                    elif entry.name.endswith(".json"):
+                        if self.ttl is not None and modified + self.ttl <= now:
+                            stale.append(entry.path)
+                        else:
+                            entries.append((modified, entry.path))
+        except OSError:
+            return 0
+
+        excess = len(entries) - self.max_disk_entries
+        if excess > 0:
+            stale.extend(path for _, path in heapq.nsmallest(excess, entries))
+
+        removed = 0
+        for path in stale:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                # Another worker got there first
+                pass
+        return removed
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide cache for /api/news results, configured from the environment"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_DIR)
+    return _result_cache
+
+
+_analysis_store = None
+
+
+def get_analysis_store():
+    """Return the process-wide store of analysis results by ID, configured from the environment"""
+    global _analysis_store
+    if _analysis_store is None:
+        with _result_cache_lock:
+            if _analysis_store is None:
+                directory = os.path.join(RESULT_CACHE_DIR, "analyses") if RESULT_CACHE_DIR else None
+                _analysis_store = ResultCache(ANALYSIS_STORE_TTL, ANALYSIS_STORE_MAX_BYTES, directory)
+    return _analysis_store
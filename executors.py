@@ -0,0 +1,174 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from metrics import METRICS_ENABLED, merge_timings, run_collecting
+from models import warm_up
+
+# Worker pool settings
+IO_WORKERS = int(os.getenv("EXECUTOR_IO_WORKERS", "8"))
+NLP_WORKERS = int(os.getenv("EXECUTOR_NLP_WORKERS", str(os.cpu_count() or 1)))
+NLP_EXECUTOR = os.getenv("EXECUTOR_NLP_KIND", "process")  # "process" or "thread"
+MAX_PENDING = int(os.getenv("EXECUTOR_MAX_PENDING", str(4 * NLP_WORKERS)))
+
+
+class Overloaded(Exception):
+    """Raised when more work is queued than the pools accept"""
+
+
+class WorkerPools:
+    """
+    Runs blocking work off the event loop: a thread pool for network and disk
+    I/O, and a process pool, with the NLP models preloaded in every worker,
+    for CPU-bound analysis.
+
+    Both pools share one bound on queued plus running jobs. Work submitted past
+    that bound is rejected with Overloaded instead of queuing up.
+    """
+
+    def __init__(self, io_workers=IO_WORKERS, nlp_workers=NLP_WORKERS, nlp_executor=NLP_EXECUTOR,
+                 max_pending=MAX_PENDING, warm_up_models=True):
+        """
+        Parameters:
+        io_workers (int): Threads for I/O-bound work
+        nlp_workers (int): Workers for CPU-bound NLP work
+        nlp_executor (str): "process" for a process pool, "thread" to keep NLP in this process
+        max_pending (int): Maximum number of jobs queued or running at once
+        warm_up_models (bool): Load the NLP models in every worker process as it starts
+        """
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io")
+        if nlp_executor == "process":
+            # Spawned workers do not inherit the server's threads or sockets
+            self.nlp_executor = ProcessPoolExecutor(
+                max_workers=nlp_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_up if warm_up_models else None
+            )
+        else:
+            self.nlp_executor = ThreadPoolExecutor(max_workers=nlp_workers, thread_name_prefix="nlp")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def run_io(self, fn, *args):
+        """Run a blocking I/O-bound function in the thread pool"""
+        return await self._run(self.io_executor, fn, *args)
+
+    async def run_nlp(self, fn, *args):
+        """Run a CPU-bound function in the NLP pool; fn and args must be picklable for a process pool"""
+        return await self._run(self.nlp_executor, fn, *args)
+
+    def reserve(self):
+        """
+        Take one slot for a series of NLP jobs, such as the articles of a streamed analysis
+
+        Returns:
+        Reservation: Runs the jobs under the slot; call its release() when done
+
+        Raises:
+        Overloaded: When every slot is taken
+        """
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Server is busy, try again shortly")
+        return Reservation(self)
+
+    async def _run(self, executor, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Server is busy, try again shortly")
+        try:
+            future = self._submit(executor, fn, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Released when the job ends rather than when the caller stops waiting: the
+        # job of a cancelled request keeps running, and keeps counting against max_pending
+        future.add_done_callback(lambda _: self._slots.release())
+        return await self._result(future)
+
+    @staticmethod
+    def _submit(executor, fn, args):
+        if METRICS_ENABLED:
+            # Bring the stage timings back from the worker along with the result
+            return executor.submit(run_collecting, fn, *args)
+        return executor.submit(fn, *args)
+
+    @staticmethod
+    async def _result(future):
+        if METRICS_ENABLED:
+            result, error, timings, errors = await asyncio.wrap_future(future)
+            merge_timings(timings, errors)
+            if error is not None:
+                raise error
+            return result
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """Stop both pools, cancelling work that has not started"""
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.nlp_executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Reservation:
+    """
+    A worker pool slot held for a series of NLP jobs, see WorkerPools.reserve
+
+    The slot is given back once release() has been called and the last job
+    has finished, so work left running by a cancelled stream still counts.
+    """
+
+    def __init__(self, pools):
+        self._pools = pools
+        self._lock = threading.Lock()
+        self._holders = 1  # the reservation until release(), plus every running job
+        self._released = False
+
+    async def run_nlp(self, fn, *args):
+        """Run a CPU-bound function in the NLP pool under this reservation's slot"""
+        with self._lock:
+            if self._released:
+                raise RuntimeError("The reservation was released")
+            self._holders += 1
+        try:
+            future = self._pools._submit(self._pools.nlp_executor, fn, args)
+        except BaseException:
+            self._drop()
+            raise
+        future.add_done_callback(lambda _: self._drop())
+        return await self._pools._result(future)
+
+    def release(self):
+        """Stop running jobs under this reservation; safe to call more than once"""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._drop()
+
+    def _drop(self):
+        with self._lock:
+            self._holders -= 1
+            done = self._holders == 0
+        if done:
+            self._pools._slots.release()
+
+
+_pools = None
+_pools_lock = threading.Lock()
+
+
+def get_worker_pools():
+    """Return the process-wide worker pools, configured from the environment"""
+    global _pools
+    if _pools is None:
+        with _pools_lock:
+            if _pools is None:
+                _pools = WorkerPools()
+    return _pools
+
+
+def shutdown_worker_pools():
+    """Shut down the process-wide worker pools if they were started"""
+    global _pools
+    with _pools_lock:
+        if _pools is not None:
+            _pools.shutdown()
+            _pools = None
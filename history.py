@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import threading
+import time
+from cache import normalize_key
+
+# Where analyzed articles are recorded; set NEWS_HISTORY_DB to an empty string to turn recording off
+HISTORY_DB = os.getenv("NEWS_HISTORY_DB", "news_history.db") or None
+
+# Bucket sizes, in seconds, accepted by trend queries
+BUCKETS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL DEFAULT '',
+    sentiment TEXT NOT NULL,
+    polarity REAL,
+    compound REAL,
+    fetched_at REAL NOT NULL,
+    UNIQUE (company_key, title, link)
+);
+-- Covers the trend query, so it is answered from the index alone
+CREATE INDEX IF NOT EXISTS idx_articles_company_time
+    ON articles (company_key, fetched_at, sentiment, polarity, compound);
+CREATE TABLE IF NOT EXISTS article_topics (
+    article_id INTEGER NOT NULL REFERENCES articles (id) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (article_id, topic)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_article_topics_topic ON article_topics (topic, article_id);
+"""
+
+
+class HistoryStore:
+    """
+    SQLite record of every analyzed article, for sentiment trends over time.
+
+    An article is stored once per company, the first time it is seen, so
+    fetching the same results again does not skew the trend. The database
+    runs in WAL mode, so several server workers can write while others read.
+    """
+
+    def __init__(self, path=HISTORY_DB):
+        """
+        Parameters:
+        path (str): SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connect(self):
+        # sqlite3 connections may not be shared between threads, so each thread opens its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    def record(self, company_name, articles, fetched_at=None):
+        """
+        Store processed articles for a company
+
+        Parameters:
+        company_name (str): Name of the company
+        articles (list): Processed articles with "Title", "Sentiment" and "Topics", and optionally "Link" and "Scores"
+        fetched_at (float, optional): Unix time the articles were fetched. Defaults to now.
+
+        Returns:
+        int: Number of articles that were not recorded before
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        company_key = normalize_key(company_name)
+        added = 0
+        with self._connect() as connection:
+            for article in articles:
+                scores = article.get("Scores") or {}
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO articles "
+                    "(company, company_key, title, link, sentiment, polarity, compound, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (company_name, company_key, article["Title"], article.get("Link") or "",
+                     article["Sentiment"], scores.get("Polarity"), scores.get("Compound"), fetched_at)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO article_topics (article_id, topic) VALUES (?, ?)",
+                        [(cursor.lastrowid, topic) for topic in article["Topics"]]
+                    )
+        return added
+
+    def trend(self, company_name, since=None, until=None, bucket="day", topic=None):
+        """
+        Sentiment of a company's coverage per time bucket
+
+        Parameters:
+        company_name (str): Name of the company
+        since (float, optional): Unix time to start from. Defaults to the first record.
+        until (float, optional): Unix time to stop at. Defaults to now.
+        bucket (str): Bucket size, a key of BUCKETS
+        topic (str, optional): Only count articles about this topic
+
+        Returns:
+        list: One dict per non-empty bucket, oldest first, with "bucket_start",
+        "articles", "positive", "negative", "neutral", "mean_polarity" and "mean_compound"
+        """
+        size = BUCKETS[bucket]
+        query = (
+            "SELECT CAST(fetched_at / :size AS INTEGER) * :size AS bucket_start, COUNT(*), "
+            "SUM(sentiment = 'Positive'), SUM(sentiment = 'Negative'), SUM(sentiment = 'Neutral'), "
+            "AVG(polarity), AVG(compound) "
+            "FROM articles WHERE company_key = :company AND fetched_at >= :since AND fetched_at < :until"
+        )
+        if topic is not None:
+            # Probe the topic per article of the company, not the other way around
+            query += " AND EXISTS (SELECT 1 FROM article_topics WHERE article_id = articles.id AND topic = :topic)"
+        query += " GROUP BY bucket_start ORDER BY bucket_start"
+
+        rows = self._connect().execute(query, self._range(company_name, since, until, size=size, topic=topic))
+        return [
+            {
+                "bucket_start": bucket_start,
+                "articles": count,
+                "positive": positive,
+                "negative": negative,
+                "neutral": neutral,
+                "mean_polarity": mean_polarity,
+                "mean_compound": mean_compound,
+            }
+            for bucket_start, count, positive, negative, neutral, mean_polarity, mean_compound in rows
+        ]
+
+    def topics(self, company_name, since=None, until=None, limit=10):
+        """
+        Most covered topics for a company
+
+        Parameters:
+        company_name (str): Name of the company
+        since (float, optional): Unix time to start from
+        until (float, optional): Unix time to stop at. Defaults to now.
+        limit (int): Number of topics to return
+
+        Returns:
+        list: Dicts with "topic", "articles" and "mean_compound", most covered first
+        """
+        rows = self._connect().execute(
+            "SELECT t.topic, COUNT(*) AS articles, AVG(a.compound) "
+            "FROM articles a JOIN article_topics t ON t.article_id = a.id "
+            "WHERE a.company_key = :company AND a.fetched_at >= :since AND a.fetched_at < :until "
+            "GROUP BY t.topic ORDER BY articles DESC, t.topic LIMIT :limit",
+            self._range(company_name, since, until, limit=limit)
+        )
+        return [
+            {"topic": topic, "articles": count, "mean_compound": mean_compound}
+            for topic, count, mean_compound in rows
+        ]
+
+    def _range(self, company_name, since, until, **params):
+        return {
+            "company": normalize_key(company_name),
+            "since": since if since is not None else 0,
+            "until": until if until is not None else time.time() + 1,
+            **params,
+        }
+
+
+_history_store = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Return the process-wide history store, or None when NEWS_HISTORY_DB is empty"""
+    global _history_store
+    if _history_store is None and HISTORY_DB:
+        with _history_store_lock:
+            if _history_store is None:
+                _history_store = HistoryStore(HISTORY_DB)
+    return _history_store
+
+
+def record_analysis(processed_data, fetched_at=None):
+    """
+    Record the articles of an analysis in the history store, if it is enabled
+
+    History is best effort: any failure, including creating the database, is
+    reported and swallowed so it never fails the analysis itself.
+
+    Parameters:
+    processed_data (dict): Output of sentiment.process_news_articles
+    fetched_at (float, optional): Unix time the articles were fetched. Defaults to now.
+
+    Returns:
+    int: Number of newly recorded articles
+    """
+    try:
+        store = get_history_store()
+        if store is None:
+            return 0
+        return store.record(processed_data["Company"], processed_data["Articles"], fetched_at)
+    except Exception as e:
+        print(f"Failed to record article history: {e}")
+        return 0
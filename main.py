@@ -1,21 +1,9 @@
-import nltk
-import os
-import spacy
-from news import get_news_articles
-from sentiment import process_news_articles
+import argparse
+import asyncio
+from news import get_news_articles, fetch_many
+from sentiment import process_news_articles, process_news_batch
 from text_to_speech import generate_speech_for_analysis
-
-# Download NLTK resources (only needed once)
-home_dir = os.getenv("USERPROFILE")  # On Windows, use USERPROFILE instead of HOME
-nltk.data.path.append(os.path.join(home_dir, "nltk_data"))
-
-# Load SpaCy model (run once)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import os
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+from records import dumps
 
 def display_results(processed_data):
     """Display detailed results in English"""
@@ -52,12 +40,55 @@ def display_results(processed_data):
     print("\nFinal Sentiment Analysis:")
     print(f"   {processed_data['Final Sentiment Analysis']}")
 
+def read_company_list(path):
+    """Read company names from a text file, one per line, skipping blanks and # comments"""
+    with open(path, encoding="utf-8") as company_file:
+        names = [line.strip() for line in company_file]
+    return list(dict.fromkeys(name for name in names if name and not name.startswith("#")))
+
+def run_batch(companies_file, output_file=None):
+    """
+    Analyze every company in a file, fetching concurrently and scoring all articles in one pass
+    
+    Parameters:
+    companies_file (str): Text file with one company name per line
+    output_file (str, optional): Path to write the results as JSON. If None, results are printed.
+    """
+    companies = read_company_list(companies_file)
+    company_articles = asyncio.run(fetch_many(companies))
+    
+    # Skip companies without any articles
+    found = {company: articles for company, articles in company_articles.items() if articles}
+    for company in companies:
+        if company not in found:
+            print(f"No news articles found for {company}")
+    
+    # AnalysisResult records, far smaller than the processed_data dictionaries
+    results = process_news_batch(found)
+    
+    if output_file:
+        with open(output_file, "wb") as json_file:
+            json_file.write(dumps(results, indent=True))
+        print(f"Results for {len(results)} companies saved to: {output_file}")
+    else:
+        for result in results.values():
+            display_results(result.to_dict())
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze news sentiment for companies")
+    parser.add_argument("--batch", metavar="COMPANIES_FILE", help="Analyze every company listed in a file, one per line")
+    parser.add_argument("--output", metavar="JSON_FILE", help="Write batch results to a JSON file instead of printing them")
+    args = parser.parse_args()
+    
+    if args.batch:
+        run_batch(args.batch, args.output)
+        raise SystemExit
+    
     company_name = input("Enter the company you want to know: ")
     news_articles = get_news_articles(company_name)
     
     # Process articles with sentiment and topic analysis
-    processed_data = process_news_articles(company_name, news_articles)
+    processed_data = process_news_articles(company_name, news_articles).to_dict()
     
     # Display detailed results in English
     display_results(processed_data)
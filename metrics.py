@@ -0,0 +1,288 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Opt-in: with metrics off, stage() returns a shared no-op and timed() leaves functions untouched
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTE_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+
+# Every metric that is exported: name -> (type, help text, histogram buckets)
+METRICS = {
+    "news_stage_seconds": ("histogram", "Time spent in each pipeline stage", TIME_BUCKETS),
+    "news_stage_errors_total": ("counter", "Pipeline stages that raised an exception", None),
+    "news_articles_per_request": ("histogram", "Articles analyzed per company and request", COUNT_BUCKETS),
+    "news_fetched_bytes": ("histogram", "Bytes per search results page fetched", BYTE_BUCKETS),
+    "news_requests_total": ("counter", "HTTP requests served, by route and status", None),
+}
+
+_NOOP = nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Process-local counters and histograms, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._values = {}  # (name, labels) -> float for counters, _Histogram for histograms
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, labels=()):
+        """Add to a counter; labels is a tuple of (name, value) pairs"""
+        key = (name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        """Record a value in a histogram; labels is a tuple of (name, value) pairs"""
+        key = (name, labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = _Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def render(self):
+        """
+        Returns:
+        str: Every metric in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            values = sorted(self._values.items())
+        for name, (kind, help_text, _) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in values:
+                if metric != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(value.buckets, value.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {value.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+_registry = Registry()
+
+# Stage timings of the current request, for the Server-Timing header
+_timings = contextvars.ContextVar("metrics_timings", default=None)
+
+
+class _Collected(list):
+    """Stage timings and errors of work run in a worker pool, which the submitting request records"""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}  # stage -> number of times it raised
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self.start
+        timings = _timings.get()
+        if exc_type is not None:
+            _record_errors(timings, {self.name: 1})
+        # Timings collected in a pool are recorded by the caller, see merge_timings
+        if not isinstance(timings, _Collected):
+            _registry.observe("news_stage_seconds", seconds, (("stage", self.name),))
+        if timings is not None:
+            timings.append((self.name, seconds))
+        return False
+
+
+def stage(name):
+    """
+    Time a block of code as a pipeline stage
+
+    Parameters:
+    name (str): Stage name, e.g. "fetch" or "sentiment"
+
+    Returns:
+    Context manager; a shared no-op when metrics are disabled
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Stage(name)
+
+
+def timed(name):
+    """
+    Decorator that times every call of a function, or coroutine function, as a pipeline stage
+
+    Functions are returned unchanged when metrics are disabled.
+
+    Parameters:
+    name (str): Stage name
+    """
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _Stage(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def inc(name, value=1, **labels):
+    """Add to a counter from METRICS"""
+    if METRICS_ENABLED:
+        _registry.inc(name, value, tuple(sorted(labels.items())))
+
+
+def observe(name, value, **labels):
+    """Record a value in a histogram from METRICS"""
+    if METRICS_ENABLED:
+        _registry.observe(name, value, tuple(sorted(labels.items())))
+
+
+def _record_errors(timings, errors):
+    # Errors collected in a pool are recorded by the caller, see merge_timings
+    if isinstance(timings, _Collected):
+        for name, count in errors.items():
+            timings.errors[name] = timings.errors.get(name, 0) + count
+        return
+    for name, count in errors.items():
+        _registry.inc("news_stage_errors_total", count, (("stage", name),))
+
+
+def run_collecting(fn, *args):
+    """
+    Call fn and collect the stage timings and errors it records, for work submitted to a pool
+
+    Context variables do not follow work into executor threads or worker
+    processes, so the timings travel back with the result instead. So does an
+    exception raised by fn, which the caller re-raises after merge_timings, so
+    the stages that failed are counted too.
+
+    Returns:
+    tuple: (result of fn, exception raised by fn or None, list of (stage, seconds),
+    dict of stage -> number of errors)
+    """
+    collected = _Collected()
+    token = _timings.set(collected)
+    try:
+        try:
+            result = fn(*args)
+        except Exception as e:
+            return None, e, list(collected), collected.errors
+        return result, None, list(collected), collected.errors
+    finally:
+        _timings.reset(token)
+
+
+def merge_timings(timings, errors=None):
+    """Record stage timings and errors returned by run_collecting as if they had happened here"""
+    current = _timings.get()
+    for name, seconds in timings:
+        if not isinstance(current, _Collected):
+            _registry.observe("news_stage_seconds", seconds, (("stage", name),))
+        if current is not None:
+            current.append((name, seconds))
+    if errors:
+        _record_errors(current, errors)
+
+
+def begin_request():
+    """
+    Start collecting stage timings for the current request
+
+    Returns:
+    tuple: (timings list, token to pass to end_request)
+    """
+    timings = []
+    return timings, _timings.set(timings)
+
+
+def end_request(token):
+    _timings.reset(token)
+
+
+def request_timings():
+    """
+    Returns:
+    list: Stage timings collected so far for the current request, or None outside a request
+    """
+    return _timings.get()
+
+
+def format_server_timing(timings, total=None):
+    """
+    Build a Server-Timing header value, adding up repeated stages
+
+    Parameters:
+    timings (list): (stage, seconds) pairs
+    total (float, optional): Total request time in seconds
+
+    Returns:
+    str: e.g. 'fetch;dur=120.5, sentiment;dur=31.2, total;dur=160.0'
+    """
+    durations = {}
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+    if total is not None:
+        durations["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items())
+
+
+def render_metrics():
+    """Return this process's metrics in the Prometheus text format"""
+    return _registry.render()
@@ -0,0 +1,100 @@
+import os
+import threading
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Loaded resources, keyed by name, shared by every module in the process
+_resources = {}
+_lock = threading.RLock()
+
+
+def _load_once(name, loader):
+    """
+    Return a cached resource, calling the loader only the first time it is requested
+
+    Parameters:
+    name (str): Key the resource is cached under
+    loader (callable): Function that builds the resource
+
+    Returns:
+    object: The loaded resource
+    """
+    resource = _resources.get(name)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(name)
+            if resource is None:
+                resource = loader()
+                _resources[name] = resource
+    return resource
+
+
+def _load_nltk_data():
+    import nltk
+
+    # Look in NLTK_DATA first, then in ~/nltk_data on any platform
+    data_dir = os.getenv("NLTK_DATA") or os.path.join(os.path.expanduser("~"), "nltk_data")
+    if data_dir not in nltk.data.path:
+        nltk.data.path.append(data_dir)
+
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", download_dir=data_dir, quiet=True)
+    return data_dir
+
+
+def _load_spacy():
+    import spacy
+
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        # Model is not installed yet, fetch it once and retry
+        from spacy.cli import download
+        download(SPACY_MODEL)
+        return spacy.load(SPACY_MODEL)
+
+
+def _load_vader():
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    ensure_nltk_data()
+    return SentimentIntensityAnalyzer()
+
+
+def _load_textblob():
+    from textblob.sentiments import PatternAnalyzer
+
+    return PatternAnalyzer()
+
+
+def ensure_nltk_data():
+    """Make sure the NLTK data used by VADER is available"""
+    return _load_once("nltk_data", _load_nltk_data)
+
+
+def get_nlp():
+    """Return the shared spaCy pipeline, loading it on first use"""
+    return _load_once("spacy", _load_spacy)
+
+
+def get_vader():
+    """Return the shared VADER SentimentIntensityAnalyzer, loading it on first use"""
+    return _load_once("vader", _load_vader)
+
+
+def get_textblob_analyzer():
+    """Return the shared TextBlob PatternAnalyzer, loading it on first use"""
+    return _load_once("textblob", _load_textblob)
+
+
+def warm_up():
+    """
+    Load every NLP resource up front, for servers that prefer a slower start
+    over a slow first request
+    """
+    ensure_nltk_data()
+    get_nlp()
+    get_vader()
+    get_textblob_analyzer()
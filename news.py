@@ -1,55 +1,277 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import observe, timed
+from parsers import get_parser
 
-def get_news_articles(query, num_articles=10):
+# Search endpoint, overridable so tests can point at a local stub server
+SEARCH_URL = os.getenv("NEWS_SEARCH_URL", "https://www.bing.com/news/search")
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36'
+}
+
+# Network settings shared by the blocking and the async fetchers
+REQUEST_TIMEOUT = float(os.getenv("NEWS_REQUEST_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("NEWS_MAX_RETRIES", "2"))
+BACKOFF_FACTOR = 0.5
+MAX_CONNECTIONS = int(os.getenv("NEWS_MAX_CONNECTIONS", "20"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Pagination: results pages are requested with a 1-based "first" offset, several at a time
+NUM_ARTICLES = int(os.getenv("NEWS_NUM_ARTICLES", "10"))
+PAGE_SIZE = 10
+MAX_PAGES = int(os.getenv("NEWS_MAX_PAGES", "30"))
+PAGE_CONCURRENCY = int(os.getenv("NEWS_PAGE_CONCURRENCY", "4"))
+
+_session = None
+_async_client = None
+_async_client_loop = None
+_client_lock = threading.Lock()
+
+def get_session():
+    """Return the shared requests session with connection pooling and retries"""
+    global _session
+    if _session is None:
+        with _client_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                retry = Retry(total=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR,
+                              status_forcelist=RETRY_STATUSES, allowed_methods=["GET"])
+                adapter = HTTPAdapter(pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS,
+                                      max_retries=retry)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+def get_async_client():
+    """
+    Return the shared pooled httpx client for the running event loop
+    
+    A client is bound to the loop it was created on, so a new one is created
+    when called from a different loop (e.g. successive asyncio.run calls).
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+async def close_async_client():
+    """Close the shared httpx client, e.g. on server shutdown"""
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+        _async_client_loop = None
+
+class _ArticleCollector:
+    """
+    Merges articles from successive result pages, dropping ones already seen
+    on an earlier page and holding no more than num_articles of them
+    """
+    
+    def __init__(self, num_articles):
+        self.num_articles = num_articles
+        self.articles = []
+        self._seen = set()  # (title, summary) of the collected articles
+    
+    def full(self):
+        return len(self.articles) >= self.num_articles
+    
+    def add_page(self, page_articles):
+        """Add the articles of one page and return how many were new"""
+        added = 0
+        for article in page_articles:
+            if self.full():
+                break
+            unique_key = (article["Title"], article["Summary"])
+            if unique_key not in self._seen:
+                self._seen.add(unique_key)
+                self.articles.append(article)
+                added += 1
+        return added
+    
+    def next_pages(self, page, max_pages):
+        """Pages to request in the next wave, no more than are needed to fill the collector"""
+        remaining = self.num_articles - len(self.articles)
+        wave = min(PAGE_CONCURRENCY, -(-remaining // PAGE_SIZE))
+        return range(page, min(max_pages, page + wave))
+
+def _page_params(query, page):
+    # The first page is requested without an offset
+    params = {"q": query}
+    if page:
+        params["first"] = page * PAGE_SIZE + 1
+    return params
+
+@timed("fetch")
+def get_news_articles(query, num_articles=NUM_ARTICLES, search_url=None, max_pages=MAX_PAGES):
     """
     Scrape news articles from Bing search results
     
+    Pages beyond the first are only requested when it did not hold enough
+    articles, a few at a time, until num_articles unique articles are found,
+    a wave of pages brings nothing new or max_pages is reached.
+    
     Parameters:
     query (str): The search query, typically a company name
     num_articles (int): Maximum number of articles to retrieve
+    search_url (str, optional): Search endpoint to use instead of SEARCH_URL
+    max_pages (int): Maximum number of results pages to request
     
     Returns:
     list: List of dictionaries containing article information
     """
-    search_url = f"https://www.bing.com/news/search?q={query}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36'
-    }
-    response = requests.get(search_url, headers=headers)
+    def fetch_page(page):
+        try:
+            response = get_session().get(search_url or SEARCH_URL, params=_page_params(query, page),
+                                         timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        observe("news_fetched_bytes", len(response.content))
+        return parse_news_articles(response.content, num_articles)
     
-    if response.status_code != 200:
+    first_page = fetch_page(0)
+    if first_page is None:
         print("Failed to retrieve news articles")
         return []
     
-    soup = BeautifulSoup(response.text, 'html.parser')
-    articles = []
-    seen_titles_and_summaries = set()  # Track combinations of title and summary
-    
-    for item in soup.select(".news-card")[:num_articles]:
-        # Extract the title text from the <a> tag with class="title"
-        title_tag = item.select_one("a.title")
-        if title_tag:
-            title = title_tag.text.strip()
-            link = title_tag["href"] if title_tag.has_attr("href") else None
-        else:
-            # Fallback for other potential title elements
-            title_tag = item.select_one("a")
-            title = title_tag.text.strip() if title_tag else "No title available"
-            link = title_tag["href"] if title_tag and title_tag.has_attr("href") else None
+    collector = _ArticleCollector(num_articles)
+    added = collector.add_page(first_page)
+    if collector.full() or not added or max_pages <= 1:
+        return collector.articles
+    
+    page = 1
+    with ThreadPoolExecutor(max_workers=PAGE_CONCURRENCY, thread_name_prefix="news-page") as executor:
+        while not collector.full() and page < max_pages:
+            pages = collector.next_pages(page, max_pages)
+            # Pages are merged in order so the result does not depend on timing
+            added = sum(collector.add_page(articles or []) for articles in executor.map(fetch_page, pages))
+            if not added:
+                break
+            page = pages.stop
+    
+    return collector.articles
+
+async def _fetch_page(client, url, params):
+    """Request one results page with retries, returning its raw HTML bytes or None"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await client.get(url, params=params)
+        except httpx.TransportError:
+            # Connection failures and timeouts are retried
+            response = None
+        
+        if response is not None and response.status_code == 200:
+            observe("news_fetched_bytes", len(response.content))
+            return response.content
         
-        summary_tag = item.select_one(".snippet")
+        retryable = response is None or response.status_code in RETRY_STATUSES
+        if not retryable or attempt == MAX_RETRIES:
+            break
         
-        if title and link:
-            summary = summary_tag.text.strip() if summary_tag else "No summary available"
-            
-            # Create a combined unique key of title + summary
-            unique_key = (title, summary)
-            
-            # Check if the combination has been seen before to avoid duplicates
-            if unique_key not in seen_titles_and_summaries:
-                seen_titles_and_summaries.add(unique_key)
-                # Using capitalized keys for consistency
-                articles.append({"Title": title, "Link": link, "Summary": summary})
-    
-    return articles
\ No newline at end of file
+        # Exponential backoff between attempts
+        await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
+    
+    return None
+
+@timed("fetch")
+async def fetch_news_articles(query, num_articles=NUM_ARTICLES, search_url=None, client=None, max_pages=MAX_PAGES):
+    """
+    Scrape news articles from Bing search results without blocking the event loop
+    
+    Pages beyond the first are fetched concurrently in waves of
+    PAGE_CONCURRENCY, with the same stopping rules as get_news_articles.
+    
+    Parameters:
+    query (str): The search query, typically a company name
+    num_articles (int): Maximum number of articles to retrieve
+    search_url (str, optional): Search endpoint to use instead of SEARCH_URL
+    client (httpx.AsyncClient, optional): Client to use instead of the shared one
+    max_pages (int): Maximum number of results pages to request
+    
+    Returns:
+    list: List of dictionaries containing article information
+    """
+    client = client or get_async_client()
+    url = search_url or SEARCH_URL
+    
+    async def fetch_page(page):
+        html = await _fetch_page(client, url, _page_params(query, page))
+        # Parse right away so only the extracted articles are kept, not the page
+        return parse_news_articles(html, num_articles) if html is not None else None
+    
+    first_page = await fetch_page(0)
+    if first_page is None:
+        print("Failed to retrieve news articles")
+        return []
+    
+    collector = _ArticleCollector(num_articles)
+    added = collector.add_page(first_page)
+    if collector.full() or not added or max_pages <= 1:
+        return collector.articles
+    
+    page = 1
+    while not collector.full() and page < max_pages:
+        pages = collector.next_pages(page, max_pages)
+        results = await asyncio.gather(*(fetch_page(p) for p in pages))
+        added = sum(collector.add_page(articles or []) for articles in results)
+        if not added:
+            break
+        page = pages.stop
+    
+    return collector.articles
+
+async def fetch_many(queries, num_articles=NUM_ARTICLES, max_concurrency=8, search_url=None):
+    """
+    Scrape news articles for several queries concurrently
+    
+    Parameters:
+    queries (list): Search queries, typically company names
+    num_articles (int): Maximum number of articles to retrieve per query
+    max_concurrency (int): Maximum number of queries in flight at once
+    search_url (str, optional): Search endpoint to use instead of SEARCH_URL
+    
+    Returns:
+    dict: Article lists keyed by query
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def fetch_one(query):
+        async with semaphore:
+            return await fetch_news_articles(query, num_articles, search_url)
+    
+    results = await asyncio.gather(*(fetch_one(query) for query in queries))
+    return dict(zip(queries, results))
+
+@timed("parse")
+def parse_news_articles(html, num_articles=NUM_ARTICLES, parser=None):
+    """
+    Extract article information from a Bing news results page
+    
+    Parameters:
+    html (bytes or str): Raw HTML of the results page, bytes as received (UTF-8)
+    num_articles (int): Maximum number of news cards to read
+    parser (str, optional): Parser backend name, see parsers.get_parser
+    
+    Returns:
+    list: List of dictionaries containing article information
+    """
+    if not html or not html.strip():
+        return []
+    return get_parser(parser)(html, num_articles)
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+
+# Parser used when none is requested explicitly: "auto" picks the fastest installed backend
+DEFAULT_PARSER = os.getenv("NEWS_PARSER", "auto")
+
+# XPath equivalents of the ".news-card", "a.title" and ".snippet" CSS selectors
+_CARD_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' news-card ')]"
+_TITLE_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' title ')]"
+_SNIPPET_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' snippet ')]"
+
+
+def _build_articles(cards):
+    """
+    Turn extracted (title, link, summary) card fields into article dictionaries
+
+    Parameters:
+    cards (iterable): (title, link, summary) tuples, summary is None when the card has no snippet
+
+    Returns:
+    list: List of dictionaries containing article information
+    """
+    articles = []
+    seen_titles_and_summaries = set()  # Track combinations of title and summary
+
+    for title, link, summary in cards:
+        if title and link:
+            summary = summary if summary is not None else "No summary available"
+
+            # Create a combined unique key of title + summary
+            unique_key = (title, summary)
+
+            # Check if the combination has been seen before to avoid duplicates
+            if unique_key not in seen_titles_and_summaries:
+                seen_titles_and_summaries.add(unique_key)
+                # Using capitalized keys for consistency
+                articles.append({"Title": title, "Link": link, "Summary": summary})
+
+    return articles
+
+
+def _bs4_cards(html, num_articles):
+    from bs4 import BeautifulSoup
+
+    # Decode up front; given bytes, BeautifulSoup first sniffs the encoding, which is slow
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", "replace")
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for item in soup.select(".news-card")[:num_articles]:
+        # Extract the title text from the <a> tag with class="title"
+        title_tag = item.select_one("a.title")
+        if title_tag:
+            title = title_tag.text.strip()
+            link = title_tag["href"] if title_tag.has_attr("href") else None
+        else:
+            # Fallback for other potential title elements
+            title_tag = item.select_one("a")
+            title = title_tag.text.strip() if title_tag else "No title available"
+            link = title_tag["href"] if title_tag and title_tag.has_attr("href") else None
+
+        summary_tag = item.select_one(".snippet")
+        yield title, link, summary_tag.text.strip() if summary_tag else None
+
+
+def _lxml_cards(html, num_articles):
+    import lxml.etree
+    import lxml.html
+
+    # lxml refuses str input that carries an encoding declaration, and reads bytes
+    # without a <meta charset> as Latin-1, so it always gets UTF-8 bytes and is told so
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    if not html.strip():
+        return
+    try:
+        root = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:
+        # Nothing but comments or whitespace, e.g. "Document is empty"
+        return
+
+    for item in root.xpath(_CARD_XPATH)[:num_articles]:
+        title_tags = item.xpath(_TITLE_XPATH) or item.xpath(".//a")
+        if title_tags:
+            title = title_tags[0].text_content().strip()
+            link = title_tags[0].get("href")
+        else:
+            title = "No title available"
+            link = None
+
+        summary_tags = item.xpath(_SNIPPET_XPATH)
+        yield title, link, summary_tags[0].text_content().strip() if summary_tags else None
+
+
+def _selectolax_cards(html, num_articles):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+
+    for item in tree.css(".news-card")[:num_articles]:
+        title_tag = item.css_first("a.title") or item.css_first("a")
+        if title_tag is not None:
+            title = title_tag.text().strip()
+            link = title_tag.attributes.get("href")
+        else:
+            title = "No title available"
+            link = None
+
+        summary_tag = item.css_first(".snippet")
+        yield title, link, summary_tag.text().strip() if summary_tag is not None else None
+
+
+def parse_with_bs4(html, num_articles=10):
+    """Parse a Bing news results page with BeautifulSoup's html.parser"""
+    return _build_articles(_bs4_cards(html, num_articles))
+
+
+def parse_with_lxml(html, num_articles=10):
+    """Parse a Bing news results page with lxml"""
+    return _build_articles(_lxml_cards(html, num_articles))
+
+
+def parse_with_selectolax(html, num_articles=10):
+    """Parse a Bing news results page with selectolax's Lexbor engine"""
+    return _build_articles(_selectolax_cards(html, num_articles))
+
+
+# Available backends, fastest first
+PARSERS = {
+    "selectolax": parse_with_selectolax,
+    "lxml": parse_with_lxml,
+    "bs4": parse_with_bs4,
+}
+
+# Module each backend needs, used to decide what "auto" can pick
+_BACKEND_MODULES = {
+    "selectolax": "selectolax.lexbor",
+    "lxml": "lxml.html",
+    "bs4": "bs4",
+}
+
+_resolved_parsers = {}
+
+
+def get_parser(name=None):
+    """
+    Return the parse function for a backend
+
+    Parameters:
+    name (str, optional): "selectolax", "lxml", "bs4" or "auto". Defaults to NEWS_PARSER.
+
+    Returns:
+    callable: Function taking (html, num_articles) and returning article dictionaries.
+    html may be a str or UTF-8 encoded bytes.
+    """
+    name = name or DEFAULT_PARSER
+    if name in _resolved_parsers:
+        return _resolved_parsers[name]
+
+    if name == "auto":
+        import importlib
+
+        parser = None
+        for backend, module in _BACKEND_MODULES.items():
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                continue
+            parser = PARSERS[backend]
+            break
+        if parser is None:
+            raise ImportError("No HTML parser backend is installed")
+    elif name in PARSERS:
+        parser = PARSERS[name]
+    else:
+        raise ValueError(f"Unknown parser backend: {name}")
+
+    _resolved_parsers[name] = parser
+    return parser
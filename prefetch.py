@@ -0,0 +1,130 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from language import translate_summary, LANGUAGE_CODES
+from text_to_speech import text_to_speech_cached
+
+# Opt-in: render audio for every language as soon as an analysis is ready
+AUDIO_PREFETCH = os.getenv("AUDIO_PREFETCH", "0").lower() in ("1", "true", "yes")
+AUDIO_PREFETCH_WORKERS = int(os.getenv("AUDIO_PREFETCH_WORKERS", "3"))
+# Languages queued or rendering at once; beyond that, prefetches are skipped and /api/audio renders on demand
+AUDIO_PREFETCH_MAX_PENDING = int(os.getenv("AUDIO_PREFETCH_MAX_PENDING", "32"))
+
+_executor = None
+_jobs = {}  # session id -> PrefetchJob
+_pending = 0  # languages submitted to the executor and not finished yet
+_lock = threading.Lock()
+
+
+class PrefetchJob:
+    """Background rendering of one analysis into every configured language"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.futures = []
+
+    def cancel(self):
+        """Drop languages that have not started yet and stop between steps of running ones"""
+        self.cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+    def done(self):
+        return all(future.done() for future in self.futures)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=AUDIO_PREFETCH_WORKERS, thread_name_prefix="audio-prefetch")
+    return _executor
+
+
+def _render(job, processed_data, language_code):
+    if job.cancelled.is_set():
+        return None
+    summary_text = translate_summary(processed_data, language_code)
+    if job.cancelled.is_set():
+        return None
+    # The result lands in the audio store, where /api/audio will find it
+    return text_to_speech_cached(summary_text, language_code)
+
+
+def prefetch_audio(processed_data, session_id=None, language_codes=None):
+    """
+    Translate and synthesize the summary for several languages in the background
+
+    Starting a new prefetch for a session cancels the previous one for that
+    session. Prefetches without a session are neither tracked nor cancelled.
+    Languages that would take the queue past AUDIO_PREFETCH_MAX_PENDING are
+    skipped.
+
+    Parameters:
+    processed_data (dict): The processed news data with sentiment analysis
+    session_id (str, optional): Client session the prefetch belongs to
+    language_codes (list, optional): Languages to render. Defaults to every language in LANGUAGE_CODES.
+
+    Returns:
+    PrefetchJob: Handle that can be used to cancel the work
+    """
+    global _pending
+    if language_codes is None:
+        language_codes = [lang["code"] for lang in LANGUAGE_CODES.values()]
+
+    if session_id is not None:
+        cancel_prefetch(session_id)
+
+    job = PrefetchJob()
+    executor = _get_executor()
+    for language_code in language_codes:
+        with _lock:
+            if _pending >= AUDIO_PREFETCH_MAX_PENDING:
+                break
+            _pending += 1
+        future = executor.submit(_render, job, processed_data, language_code)
+        future.add_done_callback(_release)
+        job.futures.append(future)
+
+    if session_id is not None and job.futures:
+        with _lock:
+            _jobs[session_id] = job
+        # Forget the job once every language has finished
+        for future in job.futures:
+            future.add_done_callback(lambda _: _forget(session_id, job))
+    return job
+
+
+def _release(future):
+    global _pending
+    # Runs for finished and for cancelled languages alike
+    with _lock:
+        _pending -= 1
+
+
+def _forget(session_id, job):
+    if job.done():
+        with _lock:
+            if _jobs.get(session_id) is job:
+                del _jobs[session_id]
+
+
+def cancel_prefetch(session_id=None):
+    """
+    Cancel the running prefetch for a session, if any
+
+    Parameters:
+    session_id (str, optional): Client session the prefetch belongs to
+
+    Returns:
+    bool: Whether a prefetch was cancelled
+    """
+    if session_id is None:
+        return False
+    with _lock:
+        job = _jobs.pop(session_id, None)
+    if job is None:
+        return False
+    job.cancel()
+    return True
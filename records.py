@@ -0,0 +1,117 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# orjson is several times faster than the standard library; fall back to json when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# slots=True needs Python 3.10
+@dataclass(slots=True)
+class ProcessedArticle:
+    """An article with its sentiment label, raw scores and topics"""
+    title: str
+    link: Optional[str]
+    summary: str
+    sentiment: str
+    polarity: Optional[float] = None
+    compound: Optional[float] = None
+    topics: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from an entry of processed_data["Articles"]"""
+        scores = data.get("Scores") or {}
+        return cls(
+            data.get("Title", "Untitled"),
+            data.get("Link"),
+            data.get("Summary", "No summary available"),
+            data["Sentiment"],
+            scores.get("Polarity"),
+            scores.get("Compound"),
+            list(data.get("Topics", ())),
+        )
+
+    def to_dict(self):
+        article = {"Title": self.title, "Link": self.link, "Summary": self.summary, "Sentiment": self.sentiment}
+        if self.polarity is not None or self.compound is not None:
+            article["Scores"] = {"Polarity": self.polarity, "Compound": self.compound}
+        article["Topics"] = self.topics
+        return article
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """The analysis of one company's coverage, the typed form of processed_data"""
+    company: str
+    articles: List[ProcessedArticle]
+    comparative: Dict[str, Any]
+    final_sentiment: str
+    verdict: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a processed_data dictionary, e.g. an API response or a --batch output file"""
+        return cls(
+            data["Company"],
+            [ProcessedArticle.from_dict(article) for article in data["Articles"]],
+            data["Comparative Sentiment Score"],
+            data["Final Sentiment Analysis"],
+            data.get("Sentiment Verdict"),
+        )
+
+    def to_dict(self):
+        """Return the processed_data dictionary, the shape the API and the UI use"""
+        output = {
+            "Company": self.company,
+            "Articles": [article.to_dict() for article in self.articles],
+            "Comparative Sentiment Score": self.comparative,
+            "Final Sentiment Analysis": self.final_sentiment,
+        }
+        if self.verdict is not None:
+            output["Sentiment Verdict"] = self.verdict
+        return output
+
+
+def _default(value):
+    # Records serialize in their API shape, not field by field
+    if isinstance(value, (ProcessedArticle, AnalysisResult)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value, indent=False):
+    """
+    Serialize a value, which may contain records, to JSON
+
+    Parameters:
+    value (object): JSON serializable value, records included
+    indent (bool): Pretty-print with two-space indentation
+
+    Returns:
+    bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=_default, option=option)
+    return json.dumps(value, default=_default, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def loads(data):
+    """
+    Parse JSON
+
+    Parameters:
+    data (bytes or str): JSON document
+
+    Returns:
+    object: The parsed value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
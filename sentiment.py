@@ -1,45 +1,126 @@
+import hashlib
+import heapq
 import os
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-import spacy
+import threading
+from array import array
 from collections import Counter
+from itertools import chain
+from cache import ResultCache
+from language import SentimentCategory, render_sentiment
+from metrics import stage, timed
+from models import get_nlp, get_textblob_analyzer, get_vader
+from records import AnalysisResult, ProcessedArticle
 
+# Per-article results keyed by a hash of the summary text. Entries never expire
+# because the analysis of a given text does not change; memory is bounded by LRU.
+ARTICLE_CACHE_MAX_BYTES = int(os.getenv("ARTICLE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+article_cache = ResultCache(ttl=None, max_bytes=ARTICLE_CACHE_MAX_BYTES)
 
-# Download NLTK resources (only needed once)
-home_dir = os.getenv("USERPROFILE")  # On Windows, use USERPROFILE instead of HOME
-nltk.data.path.append(os.path.join(home_dir, "nltk_data"))
 
-# Load SpaCy model (run once)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import os
-    os.system("python -m spacy download en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+class SentimentScorer:
+    """
+    Scores texts with TextBlob and VADER using analyzers that are loaded once
+    and reused for every call, instead of reloading the lexicons per text
+    """
 
+    def __init__(self):
+        # Both analyzers come from the shared model registry, so their lexicons
+        # are parsed once per process
+        self.textblob_analyzer = get_textblob_analyzer()
+        self.vader_analyzer = get_vader()
 
-def analyze_sentiment(text):
-    # Using TextBlob
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    
-    # Using VADER
-    sid = SentimentIntensityAnalyzer()
-    vader_scores = sid.polarity_scores(text)
-    
+    def score(self, texts):
+        """
+        Score a list of texts in one call
+
+        Parameters:
+        texts (list): Texts to score
+
+        Returns:
+        tuple: (array of TextBlob polarity scores, array of VADER compound scores)
+        """
+        polarities = array('d')
+        compounds = array('d')
+        for text in texts:
+            polarities.append(self.textblob_analyzer.analyze(text).polarity)
+            compounds.append(self.vader_analyzer.polarity_scores(text)['compound'])
+        return polarities, compounds
+
+    def classify(self, texts):
+        """
+        Score a list of texts and label each one as Positive, Negative or Neutral
+
+        Parameters:
+        texts (list): Texts to classify
+
+        Returns:
+        list: Sentiment labels in the same order as the texts
+        """
+        polarities, compounds = self.score(texts)
+        return [classify_scores(polarity, compound) for polarity, compound in zip(polarities, compounds)]
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+def get_sentiment_scorer():
+    """Return the process-wide SentimentScorer, creating it on first use"""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = SentimentScorer()
+    return _scorer
+
+def classify_scores(polarity, compound):
     # Combine both approaches for more robust analysis
-    if polarity > 0.1 or vader_scores['compound'] > 0.05:
+    if polarity > 0.1 or compound > 0.05:
         return "Positive"
-    elif polarity < -0.1 or vader_scores['compound'] < -0.05:
+    elif polarity < -0.1 or compound < -0.05:
         return "Negative"
     else:
         return "Neutral"
 
+def analyze_sentiment(text):
+    return get_sentiment_scorer().classify([text])[0]
+
+def analyze_sentiment_batch(texts):
+    return get_sentiment_scorer().classify(texts)
+
+# Pipeline components the topic logic relies on: entities need "ner", noun
+# chunks need "parser", lemmas need "lemmatizer" and its "attribute_ruler" and
+# "tagger" inputs. Anything else in the loaded pipeline is skipped.
+TOPIC_PIPES = ("tok2vec", "tagger", "morphologizer", "parser", "attribute_ruler", "lemmatizer", "ner")
+
+def _unused_topic_pipes(nlp):
+    return [name for name in nlp.pipe_names if name not in TOPIC_PIPES]
+
 def extract_topics(text, num_topics=3):
     # Process with SpaCy
-    doc = nlp(text)
+    nlp = get_nlp()
+    doc = nlp(text, disable=_unused_topic_pipes(nlp))
     
+    return _topics_from_doc(doc, text, num_topics)
+
+def extract_topics_batch(texts, n_process=1, batch_size=64, num_topics=3):
+    """
+    Extract topics for many texts in one pass using spaCy's nlp.pipe
+    
+    Parameters:
+    texts (list): Texts to extract topics from
+    n_process (int): Number of worker processes spaCy should use
+    batch_size (int): Number of texts spaCy buffers per batch
+    num_topics (int): Maximum number of topics per text
+    
+    Returns:
+    list: Topic lists in the same order as the texts
+    """
+    texts = list(texts)
+    nlp = get_nlp()
+    docs = nlp.pipe(texts, n_process=n_process, batch_size=batch_size, disable=_unused_topic_pipes(nlp))
+    return [_topics_from_doc(doc, text, num_topics) for doc, text in zip(docs, texts)]
+
+def _topics_from_doc(doc, text, num_topics):
     # Extract named entities
     entities = [ent.text for ent in doc.ents if ent.label_ in ["ORG", "PRODUCT", "EVENT", "GPE", "WORK_OF_ART"]]
     
@@ -85,129 +166,438 @@ def extract_topics(text, num_topics=3):
     
     return clean_topics[:num_topics]
 
-def perform_comparative_analysis(articles):
-    # Calculate sentiment distribution
-    sentiment_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
-    for article in articles:
-        sentiment_counts[article["Sentiment"]] += 1
+class ComparativeAggregator:
+    """
+    Running comparative analysis over a changing set of articles.
     
-    # Find all topics across articles
-    all_topics = set()
-    for article in articles:
-        all_topics.update(article["Topics"])
+    Sentiment counts, topic frequencies and the candidate comparison pairs are
+    updated as articles are added or removed, so nothing is recomputed from
+    scratch. As before, each article is only compared with the next
+    COMPARISON_WINDOW articles, and only when their sentiments differ.
+    Comparison text is generated for the top pairs alone, at snapshot time.
+    """
+    COMPARISON_WINDOW = 2
+    SENTIMENT_RANK = {"Positive": 1.0, "Neutral": 0.0, "Negative": -1.0}
     
-    # Find topic overlap
-    topic_frequency = {topic: 0 for topic in all_topics}
-    for article in articles:
-        for topic in article["Topics"]:
-            topic_frequency[topic] += 1
-    
-    common_topics = [topic for topic, count in topic_frequency.items() if count > 1]
-    
-    # Generate comparisons between articles
-    comparisons = []
-    if len(articles) >= 2:
-        for i in range(len(articles)-1):
-            for j in range(i+1, min(i+3, len(articles))):
-                article1 = articles[i]
-                article2 = articles[j]
-                
-                # Skip if both articles have the same sentiment
-                if article1["Sentiment"] == article2["Sentiment"]:
-                    continue
-                
-                # Get short version of titles for comparison (first 40 chars)
-                title1 = article1["Title"][:40] + "..." if len(article1["Title"]) > 40 else article1["Title"]
-                title2 = article2["Title"][:40] + "..." if len(article2["Title"]) > 40 else article2["Title"]
-                
-                comparison = {
-                    "Comparison": f"Article '{title1}' has {article1['Sentiment'].lower()} sentiment, while '{title2}' has {article2['Sentiment'].lower()} sentiment.",
-                    "Impact": generate_impact_statement(article1, article2)
-                }
-                comparisons.append(comparison)
-    
-    # Limit to most significant comparisons
-    comparisons = comparisons[:3]
-    
-    # Create topic overlap analysis
-    topic_overlap = {
-        "Common Topics": common_topics,
-        "Unique Topics": {}
-    }
+    def __init__(self, max_comparisons=3):
+        """
+        Parameters:
+        max_comparisons (int): Number of most divergent pairs reported under "Coverage Differences"
+        """
+        self.max_comparisons = max_comparisons
+        self.sentiment_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
+        self.topic_frequency = Counter()
+        self._articles = {}  # article id -> ProcessedArticle
+        self._order = []     # article ids in order of importance
+        self._pairs = {}     # (earlier id, later id) -> divergence
+        self._next_id = 0
+    
+    def __len__(self):
+        return len(self._order)
+    
+    def add(self, article):
+        """
+        Add a processed article after the ones already added
+        
+        Parameters:
+        article (ProcessedArticle): Processed article
+        
+        Returns:
+        int: Article id, to pass to remove()
+        """
+        article_id = self._next_id
+        self._next_id += 1
+        self._articles[article_id] = article
+        self._order.append(article_id)
+        self.sentiment_counts[article.sentiment] += 1
+        self.topic_frequency.update(article.topics)
+        
+        # Only the new article's window neighbours gain a candidate pair
+        position = len(self._order) - 1
+        for earlier in range(max(0, position - self.COMPARISON_WINDOW), position):
+            self._pair(self._order[earlier], article_id)
+        return article_id
     
-    # Find unique topics for each article
-    for i, article in enumerate(articles):
-        unique_topics = [topic for topic in article["Topics"] if topic_frequency[topic] == 1]
-        topic_overlap["Unique Topics"][f"Article {i+1}"] = unique_topics
+    def remove(self, article_id):
+        """
+        Remove a previously added article
+        
+        Parameters:
+        article_id (int): Id returned by add()
+        """
+        article = self._articles.pop(article_id)
+        position = self._order.index(article_id)
+        del self._order[position]
+        self.sentiment_counts[article.sentiment] -= 1
+        self.topic_frequency.subtract(article.topics)
+        for topic in article.topics:
+            if self.topic_frequency[topic] <= 0:
+                del self.topic_frequency[topic]
+        
+        for key in [key for key in self._pairs if article_id in key]:
+            del self._pairs[key]
+        
+        # Articles on either side of the gap are now close enough to be compared
+        start = max(0, position - self.COMPARISON_WINDOW)
+        end = min(len(self._order), position + self.COMPARISON_WINDOW)
+        for i in range(start, position):
+            for j in range(position, end):
+                if j - i <= self.COMPARISON_WINDOW:
+                    self._pair(self._order[i], self._order[j])
     
-    # Generate final sentiment analysis
-    final_sentiment = determine_overall_sentiment(sentiment_counts, articles)
+    def articles(self):
+        """
+        Returns:
+        list: The ProcessedArticle records, in the order they were added
+        """
+        return [self._articles[article_id] for article_id in self._order]
     
-    return {
-        "Sentiment Distribution": sentiment_counts,
-        "Coverage Differences": comparisons,
-        "Topic Overlap": topic_overlap,
-        "Final Sentiment Analysis": final_sentiment
-    }
+    @timed("comparative")
+    def snapshot(self):
+        """
+        Build the comparative analysis for the current articles
+        
+        Returns:
+        dict: Same structure as perform_comparative_analysis()
+        """
+        articles = self.articles()
+        
+        # Pick the most divergent pairs, earlier pairs first on ties, and only describe those
+        top_pairs = heapq.nlargest(
+            self.max_comparisons,
+            self._pairs.items(),
+            key=lambda item: (item[1], -item[0][0], -item[0][1])
+        )
+        comparisons = []
+        for (first_id, second_id), _ in top_pairs:
+            article1 = self._articles[first_id]
+            article2 = self._articles[second_id]
+            
+            # Get short version of titles for comparison (first 40 chars)
+            title1 = article1.title[:40] + "..." if len(article1.title) > 40 else article1.title
+            title2 = article2.title[:40] + "..." if len(article2.title) > 40 else article2.title
+            
+            comparisons.append({
+                "Comparison": f"Article '{title1}' has {article1.sentiment.lower()} sentiment, while '{title2}' has {article2.sentiment.lower()} sentiment.",
+                "Impact": generate_impact_statement(article1, article2)
+            })
+        
+        # Create topic overlap analysis
+        topic_overlap = {
+            # In order of first appearance among the current articles, which does not depend on what was removed
+            "Common Topics": list(dict.fromkeys(
+                topic for article in articles for topic in article.topics if self.topic_frequency[topic] > 1
+            )),
+            "Unique Topics": {}
+        }
+        
+        # Find unique topics for each article
+        for i, article in enumerate(articles):
+            unique_topics = [topic for topic in article.topics if self.topic_frequency[topic] == 1]
+            topic_overlap["Unique Topics"][f"Article {i+1}"] = unique_topics
+        
+        # Generate final sentiment analysis, both structured and as English prose
+        sentiment_counts = dict(self.sentiment_counts)
+        verdict = determine_sentiment_verdict(sentiment_counts, articles)
+        final_sentiment = render_sentiment(verdict["Category"], verdict["Focus Topic"], "en")
+        
+        return {
+            "Sentiment Distribution": sentiment_counts,
+            "Coverage Differences": comparisons,
+            "Topic Overlap": topic_overlap,
+            "Final Sentiment Analysis": final_sentiment,
+            "Sentiment Verdict": verdict
+        }
+    
+    def result(self, company_name):
+        """
+        Build the complete analysis of the current articles
+        
+        Parameters:
+        company_name (str): Name of the company
+        
+        Returns:
+        AnalysisResult: The articles with the comparative analysis and the final verdict
+        """
+        comparative_analysis = self.snapshot()
+        return AnalysisResult(
+            company_name,
+            self.articles(),
+            comparative_analysis,
+            comparative_analysis["Final Sentiment Analysis"],
+            comparative_analysis["Sentiment Verdict"]
+        )
+    
+    def _pair(self, first_id, second_id):
+        article1 = self._articles[first_id]
+        article2 = self._articles[second_id]
+        
+        # Skip if both articles have the same sentiment
+        if article1.sentiment == article2.sentiment:
+            return
+        
+        # Raw compound scores tell how far apart the articles are; fall back to the labels
+        if article1.compound is not None and article2.compound is not None:
+            divergence = abs(article1.compound - article2.compound)
+        else:
+            divergence = abs(self.SENTIMENT_RANK[article1.sentiment] - self.SENTIMENT_RANK[article2.sentiment])
+        self._pairs[(first_id, second_id)] = divergence
+
+def perform_comparative_analysis(articles, max_comparisons=3):
+    """
+    Compare a list of processed articles
+    
+    Parameters:
+    articles (list): ProcessedArticle records, in order of importance
+    max_comparisons (int): Number of most divergent pairs to describe
+    
+    Returns:
+    dict: Sentiment distribution, coverage differences, topic overlap and the final verdict
+    """
+    aggregator = ComparativeAggregator(max_comparisons)
+    for article in articles:
+        aggregator.add(article)
+    return aggregator.snapshot()
 
 def generate_impact_statement(article1, article2):
     # Generate an impact statement based on article sentiments and topics
-    if article1["Sentiment"] == "Positive" and article2["Sentiment"] == "Negative":
-        return f"The positive news about {', '.join(article1['Topics'][:2])} is offset by concerns regarding {', '.join(article2['Topics'][:2])}."
-    elif article1["Sentiment"] == "Negative" and article2["Sentiment"] == "Positive":
-        return f"While there are concerns about {', '.join(article1['Topics'][:2])}, positive developments in {', '.join(article2['Topics'][:2])} may balance the overall impact."
+    if article1.sentiment == "Positive" and article2.sentiment == "Negative":
+        return f"The positive news about {', '.join(article1.topics[:2])} is offset by concerns regarding {', '.join(article2.topics[:2])}."
+    elif article1.sentiment == "Negative" and article2.sentiment == "Positive":
+        return f"While there are concerns about {', '.join(article1.topics[:2])}, positive developments in {', '.join(article2.topics[:2])} may balance the overall impact."
     else:
-        return f"The articles present different perspectives on {', '.join(set(article1['Topics'][:1] + article2['Topics'][:1]))}."
+        return f"The articles present different perspectives on {', '.join(set(article1.topics[:1] + article2.topics[:1]))}."
 
-def determine_overall_sentiment(sentiment_counts, articles):
-    # Determine overall sentiment based on distribution and article importance
-    total = sum(sentiment_counts.values())
+def determine_sentiment_verdict(sentiment_counts, articles):
+    """
+    Determine the overall sentiment as structured data
     
+    Parameters:
+    sentiment_counts (dict): Number of Positive, Negative and Neutral articles
+    articles (list): ProcessedArticle records, in order of importance
+    
+    Returns:
+    dict: "Category" (SentimentCategory value), "Focus Topic" and numeric "Scores"
+    """
+    # Determine overall sentiment based on distribution and article importance
     if sentiment_counts["Positive"] > sentiment_counts["Negative"] + sentiment_counts["Neutral"]:
-        return f"Coverage is predominantly positive. Positive news about {articles[0]['Topics'][0] if articles and articles[0]['Topics'] else 'the company'} is particularly noteworthy."
+        category = SentimentCategory.PREDOMINANTLY_POSITIVE
     elif sentiment_counts["Negative"] > sentiment_counts["Positive"] + sentiment_counts["Neutral"]:
-        return f"Coverage shows significant concerns, particularly regarding {articles[0]['Topics'][0] if articles and articles[0]['Topics'] else 'the company'}."
+        category = SentimentCategory.SIGNIFICANT_CONCERNS
     elif sentiment_counts["Positive"] > sentiment_counts["Negative"]:
-        return f"Coverage is cautiously positive, with some concerns noted about {articles[0]['Topics'][0] if articles and articles[0]['Topics'] else 'the company'}."
+        category = SentimentCategory.CAUTIOUSLY_POSITIVE
     elif sentiment_counts["Negative"] > sentiment_counts["Positive"]:
-        return f"Coverage leans negative, though there are some positive developments in {articles[0]['Topics'][0] if articles and articles[0]['Topics'] else 'the company'}."
+        category = SentimentCategory.LEANS_NEGATIVE
     else:
-        return f"Coverage is mixed or neutral, with balanced perspectives on {articles[0]['Topics'][0] if articles and articles[0]['Topics'] else 'the company'}."
+        category = SentimentCategory.MIXED_NEUTRAL
+    
+    focus_topic = articles[0].topics[0] if articles and articles[0].topics else 'the company'
+    
+    # Average the raw scores of the articles that carry them
+    total = sum(sentiment_counts.values())
+    polarities = [article.polarity for article in articles if article.polarity is not None]
+    compounds = [article.compound for article in articles if article.compound is not None]
+    scores = {
+        "Net Sentiment": (sentiment_counts["Positive"] - sentiment_counts["Negative"]) / total if total else 0.0,
+        "Mean Polarity": sum(polarities) / len(polarities) if polarities else None,
+        "Mean Compound": sum(compounds) / len(compounds) if compounds else None
+    }
+    
+    return {
+        "Category": category.value,
+        "Focus Topic": focus_topic,
+        "Scores": scores
+    }
 
-def process_news_articles(company_name, news_articles):
-    processed_articles = []
+def determine_overall_sentiment(sentiment_counts, articles):
+    verdict = determine_sentiment_verdict(sentiment_counts, articles)
+    return render_sentiment(verdict["Category"], verdict["Focus Topic"], "en")
+
+def summary_key(summary):
+    """Content hash used to memoize the analysis of a summary"""
+    return hashlib.sha256(summary.encode("utf-8")).hexdigest()
+
+def article_summaries(news_articles):
+    """Summaries of news articles, the text that is analyzed"""
+    return [article.get("Summary", "No summary available") for article in news_articles]
+
+def lookup_summaries(summaries):
+    """
+    Look summaries up in the per-article cache
     
-    for article in news_articles:
-        # Extract title - Now using the correct capitalized key 'Title'
-        title = article.get("Title", "Untitled")
-        
-        # Extract summary
-        summary = article.get("Summary", "No summary available")
-        
-        # Perform sentiment analysis
-        sentiment = analyze_sentiment(summary)
-        
-        # Extract topics
-        topics = extract_topics(summary)
-        
-        processed_article = {
-            "Title": title,
-            "Summary": summary,
-            "Sentiment": sentiment,
+    Parameters:
+    summaries (list): Article summaries
+    
+    Returns:
+    tuple: (summary keys in order, cached results by key, summaries still to analyze by key)
+    """
+    keys = [summary_key(summary) for summary in summaries]
+    cached = {}
+    pending = {}
+    
+    for key, summary in zip(keys, summaries):
+        if key in cached or key in pending:
+            continue
+        result = article_cache.get(key)
+        if result is not None:
+            cached[key] = result
+        else:
+            pending[key] = summary
+    return keys, cached, pending
+
+def score_summaries(texts):
+    """
+    Score and extract topics for texts in one pass, without the cache
+    
+    This is the CPU-bound part of the analysis, which the API runs in the NLP worker pool.
+    
+    Parameters:
+    texts (list): Article summaries
+    
+    Returns:
+    list: {"Sentiment", "Scores", "Topics"} results, one per text
+    """
+    with stage("sentiment"):
+        polarities, compounds = get_sentiment_scorer().score(texts)
+    with stage("topics"):
+        all_topics = extract_topics_batch(texts)
+    return [
+        {
+            "Sentiment": classify_scores(polarity, compound),
+            "Scores": {"Polarity": polarity, "Compound": compound},
             "Topics": topics
         }
-        
-        processed_articles.append(processed_article)
+        for polarity, compound, topics in zip(polarities, compounds, all_topics)
+    ]
+
+def finish_analyses(keys, cached, pending, scored):
+    """
+    Cache newly scored summaries and put every result back in summary order
     
-    # Perform comparative analysis
-    comparative_analysis = perform_comparative_analysis(processed_articles)
+    Parameters:
+    keys, cached, pending: As returned by lookup_summaries
+    scored (list): score_summaries() results for the pending summaries
     
-    # Create final output
-    output = {
-        "Company": company_name,
-        "Articles": processed_articles,
-        "Comparative Sentiment Score": comparative_analysis,
-        "Final Sentiment Analysis": comparative_analysis["Final Sentiment Analysis"]
-    }
+    Returns:
+    list: (sentiment, scores, topics) tuples in the same order as the summaries
+    """
+    for key, result in zip(pending, scored):
+        article_cache.set(key, result)
+        cached[key] = result
+    return [
+        (cached[key]["Sentiment"], cached[key]["Scores"], list(cached[key]["Topics"]))
+        for key in keys
+    ]
+
+def analyze_summaries(summaries):
+    """
+    Get sentiment, scores and topics for each summary, analyzing only texts that are not cached yet
+    
+    Parameters:
+    summaries (list): Article summaries
+    
+    Returns:
+    list: (sentiment, scores, topics) tuples in the same order as the summaries
+    """
+    keys, cached, pending = lookup_summaries(summaries)
+    scored = score_summaries(list(pending.values())) if pending else []
+    return finish_analyses(keys, cached, pending, scored)
+
+def get_article_cache_stats():
+    """Hit and miss counters for the per-article analysis cache"""
+    return article_cache.stats()
+
+def process_news_articles(company_name, news_articles, analyses=None):
+    """
+    Analyze a company's news articles
+    
+    Parameters:
+    company_name (str): Name of the company
+    news_articles (list): News article dicts with "Title", "Link" and "Summary"
+    analyses (list, optional): analyze_summaries() results for the articles' summaries,
+    when they were computed elsewhere
+    
+    Returns:
+    AnalysisResult: The analysis; call to_dict() for the processed_data shape the API and UI use
+    """
+    if analyses is None:
+        # Perform sentiment analysis and extract topics, reusing earlier results for repeated articles
+        analyses = analyze_summaries(article_summaries(news_articles))
+    
+    return _build_analysis(company_name, news_articles, analyses)
+
+def process_news_batch(company_articles, analyses=None):
+    """
+    Analyze news for several companies, scoring and extracting topics for all summaries in one pass
+    
+    Parameters:
+    company_articles (dict): News article lists keyed by company name
+    analyses (list, optional): analyze_summaries() results for the summaries of every
+    company's articles, in order, when they were computed elsewhere
+    
+    Returns:
+    dict: AnalysisResult records keyed by company name
+    """
+    if analyses is None:
+        analyses = analyze_summaries(article_summaries(chain.from_iterable(company_articles.values())))
+    
+    # Split the flat results back up per company
+    results = {}
+    start = 0
+    for company_name, news_articles in company_articles.items():
+        end = start + len(news_articles)
+        results[company_name] = _build_analysis(company_name, news_articles, analyses[start:end])
+        start = end
+    return results
+
+def iter_news_analysis(company_name, news_articles):
+    """
+    Analyze news articles one at a time, yielding each as soon as it is scored
+    
+    Parameters:
+    company_name (str): Name of the company
+    news_articles (list): News articles to analyze
+    
+    Yields:
+    dict: {"type": "article", "index", "article"} with a ProcessedArticle for
+    every article, then {"type": "analysis", "result"} with the AnalysisResult
+    """
+    aggregator = ComparativeAggregator()
     
-    return output
\ No newline at end of file
+    for index, article in enumerate(news_articles):
+        summary = article.get("Summary", "No summary available")
+        analysis = analyze_summaries([summary])[0]
+        processed_article = build_article(article, analysis)
+        # Fold each article into the comparison as it arrives
+        aggregator.add(processed_article)
+        yield {"type": "article", "index": index, "article": processed_article}
+    
+    yield {"type": "analysis", "result": aggregator.result(company_name)}
+
+def build_article(article, analysis):
+    """
+    Combine a news article with the analysis of its summary
+    
+    Parameters:
+    article (dict): News article with "Title", "Link" and "Summary"
+    analysis (tuple): (sentiment, scores, topics), as returned by analyze_summaries
+    
+    Returns:
+    ProcessedArticle: The processed article
+    """
+    sentiment, scores, topics = analysis
+    return ProcessedArticle(
+        article.get("Title", "Untitled"),
+        article.get("Link"),
+        article.get("Summary", "No summary available"),
+        sentiment,
+        scores["Polarity"],
+        scores["Compound"],
+        topics
+    )
+
+def _build_analysis(company_name, news_articles, analyses):
+    aggregator = ComparativeAggregator()
+    for article, analysis in zip(news_articles, analyses):
+        aggregator.add(build_article(article, analysis))
+    return aggregator.result(company_name)
\ No newline at end of file
@@ -0,0 +1,609 @@
+import asyncio
+import os
+import re
+import time
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+import uvicorn
+
+from news import fetch_news_articles, fetch_many, close_async_client
+from sentiment import (process_news_articles, process_news_batch, iter_news_analysis, get_article_cache_stats,
+                       article_summaries, lookup_summaries, score_summaries, finish_analyses, build_article,
+                       ComparativeAggregator)
+from text_to_speech import TTS_BACKENDS, text_to_speech_cached
+from language import translate_summary, LANGUAGE_CODES
+from cache import get_result_cache, get_analysis_store, normalize_key
+from audio_store import get_audio_store
+from prefetch import AUDIO_PREFETCH, prefetch_audio, cancel_prefetch
+from executors import Overloaded, get_worker_pools, shutdown_worker_pools
+from records import dumps
+from history import BUCKETS, get_history_store, record_analysis
+from models import warm_up
+from metrics import (METRICS_ENABLED, begin_request, end_request, format_server_timing, inc, observe,
+                     render_metrics, request_timings, stage)
+
+# Server settings
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+API_WARM_UP = os.getenv("API_WARM_UP", "1").lower() in ("1", "true", "yes")
+# Longer company lists sent to /api/news/batch are rejected with 422
+BATCH_MAX_COMPANIES = int(os.getenv("NEWS_BATCH_MAX_COMPANIES", "500"))
+# Companies fetched and scored together within a batch, so a long list becomes
+# several NLP jobs of bounded size instead of one that holds a worker for minutes
+BATCH_CHUNK_SIZE = int(os.getenv("NEWS_BATCH_CHUNK_SIZE", "20"))
+
+# Audio IDs are SHA-256 content hashes, so the bytes behind an ID never change
+AUDIO_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+AUDIO_CHUNK_SIZE = 64 * 1024
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@asynccontextmanager
+async def lifespan(app):
+    """Load models and start the worker pools before serving, release them on shutdown"""
+    if API_WARM_UP:
+        # The streaming endpoint and thread-mode NLP analyze in this process
+        await asyncio.to_thread(warm_up)
+    get_worker_pools()
+    yield
+    shutdown_worker_pools()
+    await close_async_client()
+
+# Initialize FastAPI
+api = FastAPI(title="News Analysis API", lifespan=lifespan)
+api.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+if METRICS_ENABLED:
+    @api.middleware("http")
+    async def server_timing(request: Request, call_next):
+        """Count requests and report the time spent in each pipeline stage in a Server-Timing header"""
+        timings, token = begin_request()
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request(token)
+        route = request.scope.get("route")
+        inc("news_requests_total", route=route.path if route else "unmatched", status=response.status_code)
+        response.headers["Server-Timing"] = format_server_timing(timings, time.perf_counter() - start)
+        return response
+
+# Define API models
+class NewsRequest(BaseModel):
+    company_name: str
+    session_id: Optional[str] = None
+    prefetch_audio: Optional[bool] = None
+
+class LanguageRequest(BaseModel):
+    language_code: str
+    analysis_id: Optional[str] = None
+    processed_data: Optional[Dict[str, Any]] = None
+    backend: Optional[str] = None
+
+class NewsResponse(BaseModel):
+    processed_data: Dict[str, Any]
+    analysis_id: str
+
+class BatchNewsRequest(BaseModel):
+    company_names: List[str] = Field(max_length=BATCH_MAX_COMPANIES)
+
+class BatchNewsResponse(BaseModel):
+    results: Dict[str, Dict[str, Any]]
+    analysis_ids: Dict[str, str]
+    errors: Dict[str, str]
+
+class HistoryResponse(BaseModel):
+    company: str
+    bucket: str
+    since: float
+    trend: List[Dict[str, Any]]
+    topics: List[Dict[str, Any]]
+
+class AudioResponse(BaseModel):
+    audio_id: str
+    audio_url: str
+    summary_text: str
+    language_name: str
+
+def get_cached_analysis(company_name):
+    """
+    Look up a recent analysis of a company in the result cache
+    
+    Cache keys are normalized, so the entry may have been stored under another
+    spelling of the name. The result is relabelled with the name as requested,
+    without modifying the shared cached value; the analysis ID still refers to
+    the result as it was stored.
+    
+    Parameters:
+    company_name (str): Name of the company as requested
+    
+    Returns:
+    tuple: (processed news data, analysis ID), or (None, None) on a miss
+    """
+    entry = get_result_cache().get(normalize_key(company_name))
+    if entry is None:
+        return None, None
+    processed_data = entry["processed_data"]
+    if processed_data["Company"] != company_name:
+        processed_data = {**processed_data, "Company": company_name}
+    return processed_data, entry["analysis_id"]
+
+def cache_analysis(company_name, processed_data):
+    """
+    Cache a new analysis result, and keep it by ID so /api/audio can refer to it
+    
+    The ID is random and assigned once here; cache hits return it with the
+    result. Both caches store the same entry, serialized once.
+    
+    Parameters:
+    company_name (str): Name of the company
+    processed_data (dict): The processed news data
+    
+    Returns:
+    str: Analysis ID to send to /api/audio instead of the full result
+    """
+    analysis_id = uuid.uuid4().hex
+    entry = {"analysis_id": analysis_id, "processed_data": processed_data}
+    payload = dumps(entry)
+    get_result_cache().set(normalize_key(company_name), entry, payload)
+    get_analysis_store().set(analysis_id, entry, payload)
+    return analysis_id
+
+async def analyze_summaries_in_pool(summaries, run_nlp=None):
+    """
+    Analyze article summaries, sending only those the per-article cache does not have to the NLP pool
+    
+    The cache is looked up and filled here, in the API process, rather than in
+    each worker process, so every request shares it and /api/cache/stats reports it.
+    
+    Parameters:
+    summaries (list): Article summaries
+    run_nlp (coroutine function, optional): Runs the scoring job. Defaults to the worker pools' run_nlp.
+    
+    Returns:
+    list: (sentiment, scores, topics) tuples, as returned by sentiment.analyze_summaries
+    """
+    keys, cached, pending = lookup_summaries(summaries)
+    scored = []
+    if pending:
+        run_nlp = run_nlp or get_worker_pools().run_nlp
+        scored = await run_nlp(score_summaries, list(pending.values()))
+    return finish_analyses(keys, cached, pending, scored)
+
+# API routes
+@api.post("/api/news", response_model=NewsResponse)
+async def analyze_news(request: NewsRequest):
+    """Get and analyze news articles for a company"""
+    try:
+        # Serve recent results for the same company from the cache
+        processed_data, analysis_id = get_cached_analysis(request.company_name)
+        if processed_data is None:
+            # Get news articles
+            news_articles = await fetch_news_articles(request.company_name)
+            
+            if not news_articles:
+                raise HTTPException(status_code=404, detail="No news articles found for this company")
+            
+            # Process articles with sentiment and topic analysis
+            with stage("analyze"):
+                analyses = await analyze_summaries_in_pool(article_summaries(news_articles))
+                result = process_news_articles(request.company_name, news_articles, analyses)
+            processed_data = result.to_dict()
+            observe("news_articles_per_request", len(processed_data["Articles"]))
+            analysis_id = cache_analysis(request.company_name, processed_data)
+            # Not through the worker pools: a full queue must not fail a request whose work is done
+            await asyncio.to_thread(record_analysis, processed_data)
+        
+        # Optionally render the audio summaries in the background, replacing
+        # any prefetch still running for this session
+        should_prefetch = AUDIO_PREFETCH if request.prefetch_audio is None else request.prefetch_audio
+        if should_prefetch:
+            prefetch_audio(processed_data, request.session_id)
+        
+        return {"processed_data": processed_data, "analysis_id": analysis_id}
+    
+    except HTTPException:
+        raise
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api.post("/api/news/stream")
+async def analyze_news_stream(request: NewsRequest):
+    """
+    Get and analyze news articles for a company, streaming NDJSON events
+    
+    Each processed article is sent as {"type": "article", ...} as soon as it is
+    scored, followed by {"type": "analysis", "processed_data": ..., "analysis_id": ...}.
+    With metrics enabled, a last {"type": "timing", "server_timing": ...} event
+    reports the stage timings of the whole request in the Server-Timing format;
+    the header only covers the work done before streaming started.
+    
+    The stream holds one worker pool slot while it analyzes, and is answered
+    with 503 before streaming starts when there is none free.
+    """
+    start = time.perf_counter()
+    processed_data, analysis_id = get_cached_analysis(request.company_name)
+    news_articles = None
+    reservation = None
+    if processed_data is None:
+        news_articles = await fetch_news_articles(request.company_name)
+        if not news_articles:
+            raise HTTPException(status_code=404, detail="No news articles found for this company")
+        try:
+            reservation = get_worker_pools().reserve()
+        except Overloaded as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    timings = request_timings()
+    
+    async def generate():
+        try:
+            if reservation is None:
+                for event in iter_news_events(request, processed_data, analysis_id=analysis_id):
+                    yield dumps(event) + b"\n"
+            else:
+                async for event in stream_news_analysis(request, news_articles, reservation):
+                    yield dumps(event) + b"\n"
+        except Exception as e:
+            yield dumps({"type": "error", "detail": str(e)}) + b"\n"
+        finally:
+            if reservation is not None:
+                reservation.release()
+        if timings is not None:
+            server_timing = format_server_timing(timings, time.perf_counter() - start)
+            yield dumps({"type": "timing", "server_timing": server_timing}) + b"\n"
+    
+    body = generate()
+    if reservation is not None:
+        # Also give the slot back if the response is dropped before it starts streaming
+        weakref.finalize(body, reservation.release)
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+async def stream_news_analysis(request, news_articles, reservation):
+    """
+    Analyze news articles for /api/news/stream, scoring one article at a time in the NLP worker pool
+    
+    Parameters:
+    request (NewsRequest): The news request
+    news_articles (list): Fetched articles to analyze
+    reservation (Reservation): Worker pool slot held by the stream
+    
+    Yields:
+    dict: "article" events followed by a final "analysis" event carrying the analysis ID
+    """
+    aggregator = ComparativeAggregator()
+    for index, article in enumerate(news_articles):
+        analyses = await analyze_summaries_in_pool(article_summaries([article]), reservation.run_nlp)
+        processed_article = build_article(article, analyses[0])
+        # Fold each article into the comparison as it arrives
+        aggregator.add(processed_article)
+        yield {"type": "article", "index": index, "article": processed_article.to_dict()}
+    
+    processed_data, analysis_id = finish_streamed_analysis(request, aggregator.result(request.company_name))
+    # Not through the worker pools: a full queue must not fail a request whose work is done
+    await asyncio.to_thread(record_analysis, processed_data)
+    yield {"type": "analysis", "processed_data": processed_data, "analysis_id": analysis_id}
+
+def finish_streamed_analysis(request, result):
+    """
+    Cache a streamed analysis and start its audio prefetch; the caller records it in the history
+    
+    Parameters:
+    request (NewsRequest): The news request
+    result (AnalysisResult): The finished analysis
+    
+    Returns:
+    tuple: (processed news data, analysis ID)
+    """
+    processed_data = result.to_dict()
+    analysis_id = cache_analysis(request.company_name, processed_data)
+    observe("news_articles_per_request", len(processed_data["Articles"]))
+    should_prefetch = AUDIO_PREFETCH if request.prefetch_audio is None else request.prefetch_audio
+    if should_prefetch:
+        prefetch_audio(processed_data, request.session_id)
+    return processed_data, analysis_id
+
+def iter_news_events(request, processed_data=None, news_articles=None, analysis_id=None):
+    """
+    Yield the streaming analysis events for a news request, analyzing in the calling thread
+    
+    This is the synchronous form used by the in-process UI; /api/news/stream
+    analyzes through the worker pools with stream_news_analysis instead.
+    
+    Parameters:
+    request (NewsRequest): The news request
+    processed_data (dict, optional): Cached result to replay instead of analyzing
+    news_articles (list, optional): Fetched articles to analyze when there is no cached result
+    analysis_id (str, optional): ID of the cached result, as returned by get_cached_analysis
+    
+    Yields:
+    dict: "article" events followed by a final "analysis" event carrying the analysis ID
+    """
+    if processed_data is not None:
+        # Replay cached results in the same event format
+        for index, article in enumerate(processed_data["Articles"]):
+            yield {"type": "article", "index": index, "article": article}
+        yield {"type": "analysis", "processed_data": processed_data, "analysis_id": analysis_id}
+        return
+    
+    for event in iter_news_analysis(request.company_name, news_articles):
+        if event["type"] == "article":
+            yield {"type": "article", "index": event["index"], "article": event["article"].to_dict()}
+            continue
+        processed_data, analysis_id = finish_streamed_analysis(request, event["result"])
+        record_analysis(processed_data)
+        yield {"type": "analysis", "processed_data": processed_data, "analysis_id": analysis_id}
+
+@api.post("/api/news/batch", response_model=BatchNewsResponse)
+async def analyze_news_batch(request: BatchNewsRequest):
+    """Get and analyze news articles for several companies at once"""
+    try:
+        # Names that only differ in case or spacing are one company, reported under the first spelling
+        unique_names = {}
+        for company_name in request.company_names:
+            unique_names.setdefault(normalize_key(company_name), company_name)
+        company_names = list(unique_names.values())
+        
+        # Serve cached companies, fetch the rest concurrently
+        results = {}
+        analysis_ids = {}
+        for company_name in company_names:
+            processed_data, analysis_id = get_cached_analysis(company_name)
+            if processed_data is not None:
+                results[company_name] = processed_data
+                analysis_ids[company_name] = analysis_id
+        missing = [company_name for company_name in company_names if company_name not in results]
+        
+        # Work through the rest in chunks, fetching the next chunk while the current one is scored.
+        # Each finished chunk is cached, so a batch cut short by a 503 is cheap to retry.
+        errors = {}
+        chunks = [missing[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(missing), BATCH_CHUNK_SIZE)]
+        fetching = asyncio.ensure_future(fetch_many(chunks[0])) if chunks else None
+        try:
+            for i in range(len(chunks)):
+                company_articles = await fetching
+                fetching = asyncio.ensure_future(fetch_many(chunks[i + 1])) if i + 1 < len(chunks) else None
+                
+                for company_name, news_articles in company_articles.items():
+                    if not news_articles:
+                        errors[company_name] = "No news articles found for this company"
+                found = {company_name: news_articles for company_name, news_articles in company_articles.items() if news_articles}
+                for company_name, processed_data in (await analyze_batch_chunk(found)).items():
+                    analysis_ids[company_name] = cache_analysis(company_name, processed_data)
+                    results[company_name] = processed_data
+        finally:
+            if fetching is not None:
+                fetching.cancel()
+        
+        # Answer in the order the companies were asked for
+        results = {company_name: results[company_name] for company_name in company_names if company_name in results}
+        return {"results": results, "analysis_ids": analysis_ids, "errors": errors}
+    
+    except HTTPException:
+        raise
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def analyze_batch_chunk(company_articles):
+    """
+    Analyze the articles of several companies as one NLP job, and record them in the history
+    
+    Parameters:
+    company_articles (dict): News articles keyed by company name, none of them empty
+    
+    Returns:
+    dict: processed_data dictionaries keyed by company name
+    """
+    if not company_articles:
+        return {}
+    
+    # Score and extract topics for every company's articles in one pass
+    with stage("analyze"):
+        analyses = await analyze_summaries_in_pool(
+            article_summaries(news_article for news_articles in company_articles.values() for news_article in news_articles)
+        )
+        # Only the comparison is left, which is light, but for many companies still too long for the event loop
+        batch_results = await asyncio.to_thread(process_news_batch, company_articles, analyses)
+    batch_results = {company_name: result.to_dict() for company_name, result in batch_results.items()}
+    for processed_data in batch_results.values():
+        observe("news_articles_per_request", len(processed_data["Articles"]))
+    
+    def record_batch():
+        for processed_data in batch_results.values():
+            record_analysis(processed_data)
+    # Not through the worker pools: a full queue must not fail a request whose work is done
+    await asyncio.to_thread(record_batch)
+    return batch_results
+
+@api.delete("/api/prefetch/{session_id}")
+async def stop_prefetch(session_id: str):
+    """Cancel background audio rendering for a session"""
+    return {"cancelled": cancel_prefetch(session_id)}
+
+@api.get("/api/cache/stats")
+async def cache_stats():
+    """Get hit and miss counters for the news result and per-article caches"""
+    return {
+        "results": get_result_cache().stats(),
+        "articles": get_article_cache_stats()
+    }
+
+@api.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled, set METRICS_ENABLED=1")
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api.get("/api/history/{company_name}", response_model=HistoryResponse)
+async def company_history(company_name: str, days: float = 30, bucket: str = "day", topic: Optional[str] = None):
+    """Get the sentiment trend and most covered topics for a company from recorded articles"""
+    store = get_history_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Article history is disabled")
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of: {', '.join(BUCKETS)}")
+    
+    try:
+        since = time.time() - days * 86400
+        trend = await get_worker_pools().run_io(store.trend, company_name, since, None, bucket, topic)
+        topics = await get_worker_pools().run_io(store.topics, company_name, since)
+        return {"company": company_name, "bucket": bucket, "since": since, "trend": trend, "topics": topics}
+    
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api.post("/api/audio", response_model=AudioResponse)
+async def generate_audio(request: LanguageRequest):
+    """Generate audio summary in specified language for a stored analysis, or for posted processed_data"""
+    if request.backend is not None and request.backend not in TTS_BACKENDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown text-to-speech backend: {request.backend}, expected one of: {', '.join(TTS_BACKENDS)}"
+        )
+    if request.analysis_id is not None:
+        entry = get_analysis_store().get(request.analysis_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Analysis not found or expired")
+        processed_data = entry["processed_data"]
+    elif request.processed_data is not None:
+        processed_data = request.processed_data
+    else:
+        raise HTTPException(status_code=422, detail="Either analysis_id or processed_data is required")
+    
+    try:
+        return await get_worker_pools().run_io(render_audio, processed_data, request.language_code, request.backend)
+    
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def render_audio(processed_data, language_code, backend=None):
+    """
+    Translate the summary of an analysis and convert it to speech, blocking until the audio is stored
+    
+    Parameters:
+    processed_data (dict): The processed news data
+    language_code (str): Language code
+    backend (str, optional): Name of the TTS backend to try first
+    
+    Returns:
+    dict: The AudioResponse fields
+    """
+    # Get language information
+    language_name = next((lang["name"] for lang in LANGUAGE_CODES.values()
+                         if lang["code"] == language_code), "English")
+    
+    # Generate summary in selected language
+    summary_text = translate_summary(processed_data, language_code)
+    
+    # Convert the translated summary to speech, reusing stored audio when possible
+    audio_id, _ = text_to_speech_cached(summary_text, language_code, backend)
+    
+    return {
+        "audio_id": audio_id,
+        "audio_url": f"/api/audio/{audio_id}",
+        "summary_text": summary_text,
+        "language_name": language_name
+    }
+
+@api.get("/api/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    """Stream a generated MP3 by ID, with HTTP Range, ETag and caching support"""
+    audio_path = get_audio_store().get(audio_id) if AUDIO_ID_PATTERN.match(audio_id) else None
+    if audio_path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    etag = f'"{audio_id}"'
+    headers = {"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        audio_file = open(audio_path, "rb")
+    except FileNotFoundError:
+        # Evicted since the lookup; an open file stays readable even if it is evicted later
+        raise HTTPException(status_code=404, detail="Audio not found")
+    file_size = os.fstat(audio_file.fileno()).st_size
+    start, end = 0, file_size - 1
+    status_code = 200
+    
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = parse_byte_range(range_header, file_size)
+        if byte_range is None:
+            audio_file.close()
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{file_size}"})
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(audio_file, start, end),
+        status_code=status_code,
+        media_type="audio/mpeg",
+        headers=headers
+    )
+
+def parse_byte_range(range_header, file_size):
+    """
+    Parse a single-range "bytes=start-end" header
+    
+    Parameters:
+    range_header (str): Value of the Range header
+    file_size (int): Size of the file in bytes
+    
+    Returns:
+    tuple: (start, end) inclusive byte offsets, or None if the range is invalid or unsatisfiable
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    
+    if match.group(1) == "":
+        # Suffix range: the last N bytes
+        length = int(match.group(2))
+        if length == 0:
+            return None
+        return max(file_size - length, 0), file_size - 1
+    
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else file_size - 1
+    if start >= file_size or end < start:
+        return None
+    return start, min(end, file_size - 1)
+
+def iter_file_range(audio_file, start, end):
+    """Read an open binary file from start to end (inclusive) in chunks, closing it when done"""
+    with audio_file:
+        audio_file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = audio_file.read(min(AUDIO_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+if __name__ == "__main__":
+    # Several workers need the app as an import string
+    uvicorn.run("server:api", host=API_HOST, port=API_PORT, workers=API_WORKERS)
@@ -0,0 +1,135 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture
+def bing_page():
+    """Raw bytes of a saved Bing news results page"""
+    with open(os.path.join(FIXTURES, "bing_news.html"), "rb") as f:
+        return f.read()
+
+
+class KeywordScorer:
+    """Deterministic stand-in for SentimentScorer, so tests need neither TextBlob nor VADER"""
+
+    POSITIVE = ("beats", "record", "rose", "growth")
+    NEGATIVE = ("recall", "falls", "lawsuit", "loss")
+
+    def score(self, texts):
+        polarities, compounds = [], []
+        for text in texts:
+            text = text.lower()
+            value = 0.5 * any(word in text for word in self.POSITIVE) - 0.5 * any(word in text for word in self.NEGATIVE)
+            polarities.append(value)
+            compounds.append(value)
+        return polarities, compounds
+
+
+@pytest.fixture
+def stub_nlp(monkeypatch):
+    """Replace the NLP models with keyword scoring and capitalized-word topics"""
+    import sentiment
+
+    def extract_topics_batch(texts, *args, **kwargs):
+        return [sorted({word.strip(".,") for word in text.split() if word[:1].isupper()})[:3] for text in texts]
+
+    monkeypatch.setattr(sentiment, "_scorer", KeywordScorer())
+    monkeypatch.setattr(sentiment, "extract_topics_batch", extract_topics_batch)
+    monkeypatch.setattr(sentiment, "article_cache", sentiment.ResultCache(ttl=None))
+
+
+def make_articles(company_name, count=4):
+    """News articles for a company, mixing positive, negative and neutral summaries"""
+    summaries = (
+        "{c} beats estimates as Rockets sales rose.",
+        "{c} announces a recall of Anvils in Europe.",
+        "{c} opens an Office in Berlin.",
+        "{c} reports record growth in Rockets.",
+    )
+    return [
+        {
+            "Title": f"{company_name} story {i}",
+            "Link": f"https://example.com/{company_name.lower()}/{i}",
+            "Summary": summaries[i % len(summaries)].format(c=company_name) + f" Part {i}.",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def news_articles(monkeypatch):
+    """
+    Serve made-up news instead of scraping Bing
+
+    Returns the dict of articles per lower-cased company name; companies not in it have no news.
+    Tests may add entries, and the number of fetches is counted under the "fetches" key.
+    """
+    import news
+    import server
+
+    articles = {"acme": make_articles("Acme"), "globex": make_articles("Globex", 3)}
+    fetches = []
+
+    def lookup(company_name):
+        fetches.append(company_name)
+        return articles.get(" ".join(company_name.split()).lower(), [])
+
+    async def fetch_news_articles(company_name, *args, **kwargs):
+        return lookup(company_name)
+
+    async def fetch_many(company_names, *args, **kwargs):
+        return {company_name: lookup(company_name) for company_name in company_names}
+
+    monkeypatch.setattr(news, "get_news_articles", lambda company_name, *args, **kwargs: lookup(company_name))
+    monkeypatch.setattr(server, "fetch_news_articles", fetch_news_articles)
+    monkeypatch.setattr(server, "fetch_many", fetch_many)
+    articles["fetches"] = fetches
+    return articles
+
+
+@pytest.fixture
+def api_client(monkeypatch, tmp_path, stub_nlp, news_articles):
+    """
+    TestClient for the API with NLP in a thread pool, fresh caches, history
+    in a temporary database and audio stored in a temporary directory
+    """
+    from fastapi.testclient import TestClient
+
+    import audio_store
+    import cache
+    import executors
+    import history
+    import server
+    import text_to_speech
+
+    results = cache.ResultCache(ttl=300)
+    analyses = cache.ResultCache(ttl=3600)
+    store = audio_store.AudioStore(str(tmp_path / "audio"))
+    history_store = history.HistoryStore(str(tmp_path / "history.db"))
+
+    monkeypatch.setattr(server, "API_WARM_UP", False)
+    monkeypatch.setattr(server, "AUDIO_PREFETCH", False)
+    monkeypatch.setattr(executors, "_pools", executors.WorkerPools(io_workers=4, nlp_workers=2, nlp_executor="thread"))
+    for module in (server, cache):
+        monkeypatch.setattr(module, "get_result_cache", lambda: results)
+        monkeypatch.setattr(module, "get_analysis_store", lambda: analyses)
+    for module in (server, text_to_speech, audio_store):
+        monkeypatch.setattr(module, "get_audio_store", lambda: store)
+    monkeypatch.setattr(history, "HISTORY_DB", history_store.path)
+    monkeypatch.setattr(history, "_history_store", history_store)
+
+    with TestClient(server.api) as client:
+        client.result_cache = results
+        client.analysis_store = analyses
+        client.audio_store = store
+        client.history_store = history_store
+        yield client
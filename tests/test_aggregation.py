@@ -0,0 +1,173 @@
+import math
+import os
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import aggregation
+from history import HistoryStore
+from records import AnalysisResult, ProcessedArticle
+from sentiment import determine_sentiment_verdict
+
+
+def _article(sentiment, compound, topics):
+    article = {"Title": "", "Sentiment": sentiment, "Topics": topics}
+    if compound is not None:
+        article["Scores"] = {"Polarity": compound / 2, "Compound": compound}
+    return article
+
+
+@pytest.fixture
+def results():
+    return {
+        "Acme": {"Company": "Acme", "Articles": [
+            _article("Positive", 0.8, ["Rockets", "Earnings"]),
+            _article("Positive", 0.4, ["Rockets"]),
+            _article("Negative", -0.6, ["Lawsuit"]),
+            _article("Neutral", None, ["Earnings"]),
+        ]},
+        "Globex": {"Company": "Globex", "Articles": [
+            _article("Negative", -0.2, ["Earnings"]),
+            _article("Negative", -0.8, []),
+            _article("Neutral", 0.0, ["Earnings", "Hiring"]),
+        ]},
+    }
+
+
+def test_summary_matches_the_per_article_verdict(results):
+    summary = aggregation.summarize(aggregation.articles_frame(results))
+    for company_name, processed_data in results.items():
+        articles = [ProcessedArticle.from_dict(article) for article in processed_data["Articles"]]
+        counts = Counter({"Positive": 0, "Negative": 0, "Neutral": 0})
+        counts.update(article.sentiment for article in articles)
+        row = summary.loc[company_name]
+        assert row["Category"] == determine_sentiment_verdict(counts, articles)["Category"]
+        assert [row[label] for label in aggregation.SENTIMENT_LABELS] == [
+            counts["Positive"], counts["Negative"], counts["Neutral"]
+        ]
+
+
+def test_means_skip_missing_scores(results):
+    frame = aggregation.articles_frame(results)
+    summary = aggregation.summarize(frame, aggregation.rank_weights(frame))
+    # Acme's neutral article has no scores, so only the first three count
+    assert summary.loc["Acme", "Mean Compound"] == pytest.approx((0.8 + 0.4 - 0.6) / 3)
+    weights = [1, 1 / 2, 1 / 3]
+    assert summary.loc["Acme", "Weighted Compound"] == pytest.approx(
+        (0.8 * weights[0] + 0.4 * weights[1] - 0.6 * weights[2]) / sum(weights)
+    )
+    assert summary.loc["Globex", "Net Sentiment"] == pytest.approx(-2 / 3)
+
+
+def test_distribution_shares(results):
+    distribution = aggregation.sentiment_distribution(aggregation.articles_frame(results))
+    assert distribution.loc["Acme", "Positive Share"] == pytest.approx(0.5)
+    assert distribution.loc["Globex", "Positive"] == 0
+    assert distribution.loc["Globex", "Negative Share"] == pytest.approx(2 / 3)
+
+
+def test_topic_sentiment_orders_topics_by_coverage(results):
+    topics = aggregation.topic_sentiment(aggregation.articles_frame(results))
+    # Ties keep alphabetical order
+    assert list(topics.loc["Acme"].index) == ["Earnings", "Rockets", "Lawsuit"]
+    assert list(topics.loc["Acme", "articles"]) == [2, 2, 1]
+    assert topics.loc[("Acme", "Rockets"), "compound"] == pytest.approx(0.6)
+    # Only the scored Earnings article counts towards the mean
+    assert topics.loc[("Acme", "Earnings"), "compound"] == pytest.approx(0.8)
+    assert list(topics.loc["Globex"].index) == ["Earnings", "Hiring"]
+    assert topics.loc[("Globex", "Earnings"), "compound"] == pytest.approx(-0.1)
+
+
+def test_grouping_by_several_columns(results):
+    frame = aggregation.articles_frame(results)
+    frame["half"] = np.arange(len(frame)) % 2
+    topics = aggregation.topic_sentiment(frame, by=["company", "half"])
+    assert topics.index.names == ["company", "half", "topic"]
+    assert topics.loc[("Acme", 0, "Rockets"), "articles"] == 1
+    means = aggregation.weighted_means(frame, by=["company", "half"])
+    assert means.loc[("Acme", 1), "compound"] == pytest.approx(0.4)
+    # Acme's second half is the positive and the unscored neutral article
+    assert means.loc[("Acme", 1), "polarity"] == pytest.approx(0.2)
+    assert math.isnan(aggregation.weighted_means(frame.iloc[3:4], by="company").loc["Acme", "compound"])
+
+
+def test_frame_is_the_same_for_dicts_and_records(results):
+    frame = aggregation.articles_frame(results)
+    records = aggregation.articles_frame([AnalysisResult.from_dict({
+        **processed_data, "Comparative Sentiment Score": {}, "Final Sentiment Analysis": ""
+    }) for processed_data in results.values()])
+    assert frame.equals(records)
+    assert list(frame["position"]) == [0, 1, 2, 3, 0, 1, 2]
+    assert list(frame["company"].cat.categories) == ["Acme", "Globex"]
+
+
+def test_topics_frame_is_reused_across_groupings(results):
+    frame = aggregation.articles_frame(results)
+    topics = aggregation.topics_frame(frame)
+    assert list(topics["row"]) == [0, 0, 1, 2, 3, 4, 6, 6]
+    assert list(topics["topic"].cat.categories) == ["Earnings", "Hiring", "Lawsuit", "Rockets"]
+    assert aggregation.topic_sentiment(frame, topics=topics).equals(aggregation.topic_sentiment(frame))
+    frame["half"] = np.arange(len(frame)) % 2
+    assert aggregation.topic_sentiment(frame, by=["company", "half"], topics=topics).equals(
+        aggregation.topic_sentiment(frame, by=["company", "half"])
+    )
+
+
+def test_topic_sentiment_with_many_sparse_pairs():
+    # Too many (company, topic) pairs to count one bin each, so the keys are sorted instead
+    results = [
+        {"Company": f"Company {c:03}", "Articles": [_article("Positive", c / 200, [f"Topic {c:03}", "Shared"])]}
+        for c in range(200)
+    ]
+    topics = aggregation.topic_sentiment(aggregation.articles_frame(results))
+    assert len(topics) == 400
+    assert topics.loc[("Company 010", "Topic 010"), "compound"] == pytest.approx(0.05)
+    assert list(topics.loc["Company 010"].index) == ["Shared", "Topic 010"]
+
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(os.path.join(tmp_path, "history.db"))
+    store.record("Acme", [
+        {"Title": "Up", "Sentiment": "Positive", "Scores": {"Polarity": 0.3, "Compound": 0.6}, "Topics": ["Rockets"]},
+        {"Title": "Down", "Sentiment": "Negative", "Scores": {"Polarity": -0.1, "Compound": -0.2}, "Topics": []},
+    ], fetched_at=0)
+    store.record("Acme", [
+        {"Title": "Again", "Sentiment": "Positive", "Scores": {"Polarity": 0.2, "Compound": 0.4}, "Topics": ["Rockets"]},
+    ], fetched_at=DAY + 10)
+    store.record("Acme", [
+        {"Title": "Later", "Sentiment": "Neutral", "Scores": {"Polarity": 0.0, "Compound": 0.0}, "Topics": []},
+    ], fetched_at=5 * DAY)
+    store.record("Globex", [{"Title": "Unscored", "Sentiment": "Neutral", "Topics": ["Hiring"]}], fetched_at=DAY)
+    return store
+
+
+def test_history_frame_loads_articles_without_topics(store):
+    frame = aggregation.history_frame(store)
+    assert len(frame) == 5
+    topics = dict(zip(frame["compound"].fillna(9), frame["topics"]))
+    assert topics == {0.6: ["Rockets"], -0.2: [], 0.4: ["Rockets"], 0.0: [], 9: ["Hiring"]}
+    assert list(frame["sentiment"].cat.categories) == aggregation.SENTIMENT_LABELS
+
+    since = aggregation.history_frame(store, since=DAY, until=2 * DAY, with_topics=False)
+    assert sorted(since["fetched_at"]) == [DAY, DAY + 10]
+    assert "topics" not in since
+    # The frame feeds the same aggregates as live results
+    assert aggregation.topic_sentiment(frame).loc[("acme", "Rockets"), "articles"] == 2
+
+
+def test_rolling_sentiment_weighs_busy_days(store):
+    rolled = aggregation.rolling_sentiment(aggregation.history_frame(store), window="2D")
+    acme = rolled.loc["acme"]
+    assert list(acme["articles"]) == [2, 3, 1]
+    # The second day's window holds both days' articles
+    assert acme["compound"].iloc[0] == pytest.approx(0.2)
+    assert acme["compound"].iloc[1] == pytest.approx((0.6 - 0.2 + 0.4) / 3)
+    # Out of the window again by day six
+    assert acme["compound"].iloc[2] == pytest.approx(0.0)
+    assert math.isnan(rolled.loc["globex", "compound"].iloc[0])
+
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+import server
+
+AUDIO = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def audio_id(api_client):
+    key = "a" * 64
+
+    def synthesize(path):
+        with open(path, "wb") as f:
+            f.write(AUDIO)
+
+    api_client.audio_store.get_or_create(key, synthesize)
+    return key
+
+
+def test_full_download(api_client, audio_id):
+    response = api_client.get(f"/api/audio/{audio_id}")
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == f'"{audio_id}"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=100-", 100, len(AUDIO) - 1),
+    ("bytes=-100", len(AUDIO) - 100, len(AUDIO) - 1),
+    ("bytes=10000-99999", 10000, len(AUDIO) - 1),
+])
+def test_range_requests(api_client, audio_id, header, start, end):
+    response = api_client.get(f"/api/audio/{audio_id}", headers={"Range": header})
+    assert response.status_code == 206
+    assert response.content == AUDIO[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(AUDIO)}"
+    assert response.headers["content-length"] == str(end - start + 1)
+
+
+@pytest.mark.parametrize("header", ["bytes=20000-", "bytes=50-10", "bytes=-0", "items=0-1"])
+def test_unsatisfiable_range(api_client, audio_id, header):
+    response = api_client.get(f"/api/audio/{audio_id}", headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(AUDIO)}"
+
+
+def test_matching_etag_is_not_modified(api_client, audio_id):
+    response = api_client.get(f"/api/audio/{audio_id}", headers={"If-None-Match": f'"{audio_id}"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("audio_id", ["b" * 64, "..%2F" + "a" * 59, "A" * 64])
+def test_unknown_or_invalid_id_is_404(api_client, audio_id):
+    assert api_client.get(f"/api/audio/{audio_id}").status_code == 404
+
+
+def test_audio_evicted_after_lookup_is_404(api_client, audio_id, monkeypatch):
+    # The store still reports the path, but the file is gone by the time it is opened
+    path = api_client.audio_store.path(audio_id)
+    monkeypatch.setattr(api_client.audio_store, "get", lambda key: path)
+    os.remove(path)
+
+    assert api_client.get(f"/api/audio/{audio_id}").status_code == 404
+
+
+def test_generate_audio_for_a_stored_analysis(api_client, monkeypatch):
+    def text_to_speech_cached(text, language_code, backend=None):
+        key = "c" * 64
+        return key, api_client.audio_store.get_or_create(key, lambda path: open(path, "wb").close())
+
+    monkeypatch.setattr(server, "text_to_speech_cached", text_to_speech_cached)
+    analysis_id = api_client.post("/api/news", json={"company_name": "Acme"}).json()["analysis_id"]
+
+    response = api_client.post("/api/audio", json={"analysis_id": analysis_id, "language_code": "hi"})
+    assert response.status_code == 200
+    assert response.json()["audio_url"] == f"/api/audio/{'c' * 64}"
+    assert response.json()["language_name"] == "Hindi"
+
+    response = api_client.post("/api/audio", json={"analysis_id": "missing", "language_code": "hi"})
+    assert response.status_code == 404
+    response = api_client.post("/api/audio", json={"language_code": "hi"})
+    assert response.status_code == 422
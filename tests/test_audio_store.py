@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+
+import pytest
+
+import audio_store
+from audio_store import AudioStore, audio_key
+
+
+def _writer(data, calls=None, delay=0):
+    def synthesize(path):
+        if calls is not None:
+            calls.append(path)
+        time.sleep(delay)
+        with open(path, "wb") as f:
+            f.write(data)
+    return synthesize
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_audio_key_is_stable_and_content_addressed():
+    assert audio_key("Hello", "en") == audio_key("Hello", "en")
+    assert audio_key("Hello", "en") != audio_key("Hello", "hi")
+    assert audio_key("Hello", "en", {"rate": 1}) != audio_key("Hello", "en")
+
+
+def test_get_or_create_synthesizes_once(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=10 ** 6)
+    calls = []
+    path = store.get_or_create("a" * 64, _writer(b"mp3", calls))
+    assert store.get_or_create("a" * 64, _writer(b"other", calls)) == path
+    assert len(calls) == 1
+    with open(path, "rb") as f:
+        assert f.read() == b"mp3"
+
+
+def test_concurrent_requests_share_one_synthesis(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=10 ** 6)
+    calls = []
+    results = []
+    synthesize = _writer(b"mp3", calls, delay=0.2)
+    threads = [
+        threading.Thread(target=lambda: results.append(store.get_or_create("b" * 64, synthesize)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and len(set(results)) == 1
+
+
+def test_waiters_see_the_synthesis_error(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=10 ** 6)
+    started = threading.Event()
+
+    def failing(path):
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("engine failed")
+
+    errors = []
+
+    def request():
+        try:
+            store.get_or_create("c" * 64, failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=request)
+    owner.start()
+    started.wait()
+    waiter = threading.Thread(target=request)
+    waiter.start()
+    owner.join()
+    waiter.join()
+
+    assert len(errors) == 2
+    # The failed synthesis leaves no temporary file behind
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=250)
+    for i, key in enumerate(("1" * 64, "2" * 64)):
+        store.get_or_create(key, _writer(b"x" * 100))
+        _age(store.path(key), 100 - i)
+    store.get("1" * 64)  # now the most recently used
+
+    store.get_or_create("3" * 64, _writer(b"x" * 100))
+
+    assert store.get("2" * 64) is None
+    assert store.get("1" * 64) is not None
+    assert store.get("3" * 64) is not None
+
+
+def test_new_file_is_never_evicted(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=50)
+    store.get_or_create("1" * 64, _writer(b"x" * 40))
+    # A file with an mtime older than everything else, e.g. one preserved from a copy
+    path = store.get_or_create("2" * 64, lambda p: (_writer(b"x" * 100)(p), _age(p, 1000)))
+
+    assert os.path.exists(path)
+    assert store.get("1" * 64) is None
+
+
+def test_eviction_sweeps_stale_temp_files(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=10 ** 6)
+    stale = tmp_path / f"{'d' * 64}.abandoned.tmp"
+    stale.write_bytes(b"partial")
+    _age(stale, audio_store.STALE_TEMP_SECONDS + 1)
+    in_progress = tmp_path / f"{'e' * 64}.running.tmp"
+    in_progress.write_bytes(b"partial")
+
+    store.evict()
+
+    assert not stale.exists()
+    assert in_progress.exists()
+
+
+def test_get_refreshes_recency(tmp_path):
+    store = AudioStore(str(tmp_path), max_bytes=10 ** 6)
+    path = store.get_or_create("f" * 64, _writer(b"mp3"))
+    _age(path, 100)
+    store.get("f" * 64)
+    assert os.path.getmtime(path) > time.time() - 10
+
+
+@pytest.mark.parametrize("key", ["0" * 64, "missing"])
+def test_get_missing_returns_none(tmp_path, key):
+    assert AudioStore(str(tmp_path)).get(key) is None
@@ -0,0 +1,101 @@
+import json
+
+import server
+from conftest import make_articles
+from executors import Overloaded
+
+
+def test_batch_analyzes_each_company(api_client):
+    response = api_client.post("/api/news/batch", json={"company_names": ["Acme", "Globex", "Initech"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body["results"]) == ["Acme", "Globex"]
+    assert len(body["results"]["Acme"]["Articles"]) == 4
+    assert len(body["results"]["Globex"]["Articles"]) == 3
+    assert sorted(body["analysis_ids"]) == ["Acme", "Globex"]
+    assert body["errors"] == {"Initech": "No news articles found for this company"}
+
+
+def test_batch_dedupes_on_the_normalized_name(api_client, news_articles):
+    response = api_client.post("/api/news/batch", json={"company_names": ["Acme", " acme", "ACME  ", "Globex"]})
+    assert response.status_code == 200
+    body = response.json()
+    # Reported under the first spelling, fetched once
+    assert sorted(body["results"]) == ["Acme", "Globex"]
+    assert news_articles["fetches"] == ["Acme", "Globex"]
+
+
+def test_batch_uses_cached_results_with_the_requested_name(api_client, news_articles):
+    api_client.post("/api/news", json={"company_name": "ACME"})
+    response = api_client.post("/api/news/batch", json={"company_names": ["acme"]})
+    assert response.json()["results"]["acme"]["Company"] == "acme"
+    assert news_articles["fetches"] == ["ACME"]
+
+
+def test_batch_rejects_long_lists(api_client):
+    names = [f"Company {i}" for i in range(server.BATCH_MAX_COMPANIES + 1)]
+    response = api_client.post("/api/news/batch", json={"company_names": names})
+    assert response.status_code == 422
+
+    response = api_client.post("/api/news/batch", json={"company_names": names[:-1]})
+    assert response.status_code == 200
+
+
+def test_cache_hits_reuse_the_analysis_id(api_client):
+    analysis_id = api_client.post("/api/news", json={"company_name": "Acme"}).json()["analysis_id"]
+    assert api_client.post("/api/news", json={"company_name": "acme"}).json()["analysis_id"] == analysis_id
+    batch = api_client.post("/api/news/batch", json={"company_names": ["ACME", "Globex"]}).json()
+    assert batch["analysis_ids"]["ACME"] == analysis_id
+    assert batch["analysis_ids"]["Globex"] != analysis_id
+    assert api_client.analysis_store.stats()["entries"] == 2
+    # A replayed stream ends with the same ID
+    events = api_client.post("/api/news/stream", json={"company_name": "Acme"}).text.splitlines()
+    assert json.loads(events[-1])["analysis_id"] == analysis_id
+
+
+def test_article_cache_is_shared_and_only_misses_are_scored(api_client, monkeypatch):
+    scored = []
+    score_summaries = server.score_summaries
+
+    def counting(texts):
+        scored.append(len(texts))
+        return score_summaries(texts)
+
+    monkeypatch.setattr(server, "score_summaries", counting)
+    api_client.post("/api/news", json={"company_name": "Acme"})
+    api_client.result_cache.clear()
+    # Acme's articles are cached per article now, so only Globex's are scored
+    api_client.post("/api/news/batch", json={"company_names": ["Acme", "Globex"]})
+    assert scored == [4, 3]
+    stats = api_client.get("/api/cache/stats").json()["articles"]
+    assert stats["hits"] == 4
+    assert stats["entries"] == 7
+
+
+def test_long_batches_are_scored_in_chunks(api_client, news_articles, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_CHUNK_SIZE", 2)
+    for company_name in ("Initech", "Hooli", "Umbrella"):
+        news_articles[company_name.lower()] = make_articles(company_name, 2)
+    scored = []
+    score_summaries = server.score_summaries
+
+    def counting(texts):
+        scored.append(len(texts))
+        if len(scored) == 2 and fail:
+            raise Overloaded("NLP worker pool is busy")
+        return score_summaries(texts)
+
+    monkeypatch.setattr(server, "score_summaries", counting)
+    names = ["Acme", "Globex", "Initech", "Nobody", "Hooli", "Umbrella"]
+
+    # The second chunk is turned away, but the first one is kept
+    fail = True
+    assert api_client.post("/api/news/batch", json={"company_names": names}).status_code == 503
+    assert scored == [7, 2]
+
+    fail = False
+    scored.clear()
+    body = api_client.post("/api/news/batch", json={"company_names": names}).json()
+    assert scored == [2, 4]
+    assert list(body["results"]) == ["Acme", "Globex", "Initech", "Hooli", "Umbrella"]
+    assert body["errors"] == {"Nobody": "No news articles found for this company"}
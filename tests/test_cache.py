@@ -0,0 +1,152 @@
+import os
+import time
+
+import pytest
+
+import cache
+from cache import ResultCache, normalize_key
+from records import dumps
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.time in the cache module"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_key():
+    assert normalize_key("  Acme   Corp ") == normalize_key("acme corp") == "acme corp"
+
+
+def test_get_returns_stored_value_and_counts():
+    results = ResultCache(ttl=60)
+    assert results.get("acme") is None
+    results.set("acme", {"Company": "Acme"})
+    assert results.get("acme") == {"Company": "Acme"}
+    assert results.stats()["hits"] == 1
+    assert results.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    results = ResultCache(ttl=10)
+    results.set("acme", [1])
+    clock[0] += 9
+    assert results.get("acme") == [1]
+    clock[0] += 2
+    assert results.get("acme") is None
+    assert results.stats()["entries"] == 0
+
+
+def test_ttl_none_never_expires(clock):
+    results = ResultCache(ttl=None)
+    results.set("acme", [1])
+    clock[0] += 10 ** 9
+    assert results.get("acme") == [1]
+
+
+def test_least_recently_used_entry_is_evicted():
+    value = "x" * 100
+    size = len(cache.dumps(value))
+    results = ResultCache(ttl=None, max_bytes=size * 2)
+    results.set("a", value)
+    results.set("b", value)
+    results.get("a")  # "b" is now the least recently used
+    results.set("c", value)
+    assert results.get("b") is None
+    assert results.get("a") == value
+    assert results.get("c") == value
+    assert results.stats()["bytes"] == size * 2
+
+
+def test_value_larger_than_budget_is_not_kept():
+    results = ResultCache(ttl=None, max_bytes=10)
+    results.set("big", "x" * 100)
+    assert results.get("big") is None
+    assert results.stats()["bytes"] == 0
+
+
+def test_disk_backend_survives_a_new_instance(tmp_path):
+    ResultCache(ttl=60, directory=str(tmp_path)).set("acme", {"Company": "Acme", "Articles": []})
+    reopened = ResultCache(ttl=60, directory=str(tmp_path))
+    assert reopened.get("acme") == {"Company": "Acme", "Articles": []}
+    # Promoted into memory
+    assert reopened.stats()["entries"] == 1
+
+
+def test_disk_entry_expires(tmp_path, clock):
+    ResultCache(ttl=10, directory=str(tmp_path)).set("acme", [1])
+    clock[0] += 11
+    assert ResultCache(ttl=10, directory=str(tmp_path)).get("acme") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_delete_removes_disk_copy(tmp_path):
+    results = ResultCache(ttl=60, directory=str(tmp_path))
+    results.set("acme", [1])
+    results.delete("acme")
+    assert ResultCache(ttl=60, directory=str(tmp_path)).get("acme") is None
+
+
+def test_prune_disk_keeps_newest_entries(tmp_path):
+    results = ResultCache(ttl=None, directory=str(tmp_path), max_disk_entries=3)
+    paths = []
+    for i in range(5):
+        results.set(f"key{i}", i)
+        paths.append(results._path(f"key{i}"))
+        os.utime(paths[-1], (time.time() - 100 + i, time.time() - 100 + i))
+
+    assert results.prune_disk() == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in paths[2:])
+
+
+def test_prune_disk_removes_expired_entries_and_stale_temp_files(tmp_path):
+    results = ResultCache(ttl=60, directory=str(tmp_path))
+    results.set("old", 1)
+    results.set("new", 2)
+    old = time.time() - 120
+    os.utime(results._path("old"), (old, old))
+    abandoned = tmp_path / "abandoned.json.123.456.tmp"
+    abandoned.write_bytes(b"{")
+    os.utime(abandoned, (old, old))
+    in_progress = tmp_path / "in-progress.json.123.789.tmp"
+    in_progress.write_bytes(b"{")
+    (tmp_path / "analyses").mkdir()
+
+    assert results.prune_disk() == 2
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["analyses", in_progress.name, os.path.basename(results._path("new"))]
+    )
+
+
+def test_disk_is_pruned_while_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "DISK_PRUNE_INTERVAL", 5)
+    results = ResultCache(ttl=None, directory=str(tmp_path), max_disk_entries=4)
+    for i in range(12):
+        results.set(f"key{i}", i)
+    # Swept after the 1st, 6th and 11th writes
+    assert len(os.listdir(tmp_path)) <= 5
+
+
+def test_set_stores_a_given_payload(tmp_path):
+    results = ResultCache(ttl=None, directory=str(tmp_path))
+    payload = dumps({"a": 1})
+    results.set("key", {"a": 1}, payload)
+    assert results.stats()["bytes"] == len(payload)
+    # Read back from disk by a fresh instance
+    assert ResultCache(ttl=None, directory=str(tmp_path)).get("key") == {"a": 1}
+
+
+def test_cached_analysis_uses_requested_company_name(monkeypatch):
+    server = pytest.importorskip("server")
+    results = ResultCache(ttl=60)
+    monkeypatch.setattr(server, "get_result_cache", lambda: results)
+    stored = {"Company": "ACME", "Articles": []}
+    results.set(normalize_key("ACME"), {"analysis_id": "a1", "processed_data": stored})
+
+    assert server.get_cached_analysis("acme ") == ({"Company": "acme ", "Articles": []}, "a1")
+    assert server.get_cached_analysis("ACME")[0] is stored
+    assert server.get_cached_analysis("Globex") == (None, None)
+    # The shared cached value is left as it was
+    assert stored["Company"] == "ACME"
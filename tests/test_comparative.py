@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from records import ProcessedArticle
+from sentiment import ComparativeAggregator, perform_comparative_analysis
+
+TOPICS = ["Earnings", "Rockets", "Anvils", "Lawsuit", "Hiring"]
+
+
+def _article(title, sentiment, compound, topics):
+    return ProcessedArticle(title, None, "", sentiment, None if compound is None else compound / 2, compound, topics)
+
+
+def _random_article(rng, number):
+    sentiment = rng.choice(["Positive", "Negative", "Neutral"])
+    compound = None if rng.random() < 0.2 else round(rng.uniform(-1, 1), 3)
+    return _article(f"Article {number}", sentiment, compound, rng.sample(TOPICS, rng.randint(0, 3)))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_snapshot_after_adds_and_removes_equals_a_fresh_build(seed):
+    rng = random.Random(seed)
+    aggregator = ComparativeAggregator()
+    ids = []
+    for number in range(30):
+        if ids and rng.random() < 0.4:
+            aggregator.remove(ids.pop(rng.randrange(len(ids))))
+        else:
+            ids.append(aggregator.add(_random_article(rng, number)))
+        assert aggregator.snapshot() == perform_comparative_analysis(aggregator.articles())
+
+
+def test_common_topics_follow_the_current_articles():
+    aggregator = ComparativeAggregator()
+    first = aggregator.add(_article("a", "Positive", 0.5, ["Lawsuit", "Rockets"]))
+    aggregator.add(_article("b", "Negative", -0.5, ["Earnings", "Rockets"]))
+    aggregator.add(_article("c", "Neutral", 0.0, ["Earnings", "Lawsuit"]))
+    assert aggregator.snapshot()["Topic Overlap"]["Common Topics"] == ["Lawsuit", "Rockets", "Earnings"]
+    aggregator.remove(first)
+    aggregator.add(_article("d", "Neutral", 0.1, ["Lawsuit", "Rockets"]))
+    # Earnings now comes first among the current articles, even though Lawsuit was counted earlier
+    assert aggregator.snapshot()["Topic Overlap"]["Common Topics"] == ["Earnings", "Rockets", "Lawsuit"]
+
+
+def test_coverage_differences_report_the_most_divergent_pairs():
+    articles = [
+        _article("a", "Positive", 0.9, ["Rockets"]),
+        _article("b", "Negative", -0.8, ["Lawsuit"]),   # a-b 1.7
+        _article("c", "Neutral", 0.0, ["Earnings"]),    # a-c 0.9, b-c 0.8
+        _article("d", "Positive", 0.8, ["Hiring"]),     # b-d 1.6, c-d 0.8
+        _article("e", "Negative", None, ["Anvils"]),    # c-e 1.0 and d-e 2.0 from the labels
+        _article("f", "Neutral", 0.1, ["Rockets"]),     # d-f 0.7, e-f 1.0 from the labels
+    ]
+    comparisons = perform_comparative_analysis(articles, max_comparisons=3)["Coverage Differences"]
+    assert [comparison["Comparison"] for comparison in comparisons] == [
+        "Article 'd' has positive sentiment, while 'e' has negative sentiment.",
+        "Article 'a' has positive sentiment, while 'b' has negative sentiment.",
+        "Article 'b' has negative sentiment, while 'd' has positive sentiment.",
+    ]
+
+    aggregator = ComparativeAggregator(max_comparisons=2)
+    ids = [aggregator.add(article) for article in articles]
+    aggregator.remove(ids[1])
+    aggregator.remove(ids[3])
+    # a and e are now close enough to be compared; c-e and e-f tie, and the earlier pair wins
+    comparisons = aggregator.snapshot()["Coverage Differences"]
+    assert [comparison["Comparison"] for comparison in comparisons] == [
+        "Article 'a' has positive sentiment, while 'e' has negative sentiment.",
+        "Article 'c' has neutral sentiment, while 'e' has negative sentiment.",
+    ]
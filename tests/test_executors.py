@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import executors
+import server
+from executors import Overloaded, WorkerPools
+
+
+@pytest.fixture
+def pools():
+    pools = WorkerPools(io_workers=2, nlp_workers=2, nlp_executor="thread", max_pending=2)
+    yield pools
+    pools.shutdown()
+
+
+def test_run_io_and_run_nlp_return_results(pools):
+    async def run():
+        return await pools.run_io(sum, [1, 2]), await pools.run_nlp(max, 3, 4)
+
+    assert asyncio.run(run()) == (3, 4)
+
+
+def test_work_beyond_max_pending_is_rejected(pools):
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.ensure_future(pools.run_nlp(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await pools.run_io(sum, [1])
+        release.set()
+        await asyncio.gather(*blocked)
+        # Slots are given back once the work finishes
+        return await pools.run_io(sum, [1])
+
+    assert asyncio.run(run()) == 1
+
+
+def test_slot_is_released_when_work_fails(pools):
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await pools.run_nlp(fail)
+        return await pools.run_nlp(sum, [2])
+
+    assert asyncio.run(run()) == 2
+
+
+def test_slot_is_held_until_cancelled_work_finishes(pools):
+    release = threading.Event()
+
+    async def run():
+        waiting = asyncio.ensure_future(pools.run_nlp(release.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.sleep(0.05)
+        # The job still runs in the pool, so it still holds one of the two slots
+        blocked = asyncio.ensure_future(pools.run_io(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await pools.run_io(sum, [1])
+        release.set()
+        await blocked
+        await asyncio.sleep(0.05)
+        return await pools.run_io(sum, [1])
+
+    assert asyncio.run(run()) == 1
+
+
+def test_reservation_holds_one_slot_until_its_jobs_finish(pools):
+    release = threading.Event()
+
+    async def run():
+        reservation = pools.reserve()
+        assert await reservation.run_nlp(sum, [1, 2]) == 3
+        # Jobs run under the reservation's slot rather than taking their own
+        await pools.run_io(sum, [1])
+        running = asyncio.ensure_future(reservation.run_nlp(release.wait, 5))
+        await asyncio.sleep(0.05)
+        reservation.release()
+        reservation.release()
+        with pytest.raises(RuntimeError):
+            await reservation.run_nlp(sum, [1])
+        # Released, but its job is still running
+        blocked = asyncio.ensure_future(pools.run_io(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            pools.reserve()
+        release.set()
+        await asyncio.gather(running, blocked)
+        await asyncio.sleep(0.05)
+        pools.reserve().release()
+        pools.reserve().release()
+        return True
+
+    assert asyncio.run(run())
+
+
+def square(value):
+    return value * value
+
+
+def fail_in_worker():
+    raise ValueError("boom in worker")
+
+
+def test_spawned_process_pool_runs_picklable_jobs():
+    pools = WorkerPools(io_workers=1, nlp_workers=2, nlp_executor="process", warm_up_models=False)
+
+    async def run():
+        results = await asyncio.gather(*(pools.run_nlp(square, n) for n in range(4)))
+        with pytest.raises(ValueError, match="boom in worker"):
+            await pools.run_nlp(fail_in_worker)
+        return results
+
+    try:
+        assert asyncio.run(run()) == [0, 1, 4, 9]
+    finally:
+        pools.shutdown()
+
+
+def test_api_answers_503_when_overloaded(api_client, monkeypatch):
+    monkeypatch.setattr(executors, "_pools", WorkerPools(io_workers=1, nlp_workers=1, nlp_executor="thread",
+                                                         max_pending=0))
+    response = api_client.post("/api/news", json={"company_name": "Acme"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    response = api_client.post("/api/news/stream", json={"company_name": "Acme"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_stream_scores_articles_in_the_pool_under_one_slot(api_client, monkeypatch):
+    pools = WorkerPools(io_workers=1, nlp_workers=1, nlp_executor="thread", max_pending=1)
+    monkeypatch.setattr(executors, "_pools", pools)
+    threads = []
+    score_summaries = server.score_summaries
+
+    def scoring(texts):
+        threads.append(threading.current_thread().name)
+        return score_summaries(texts)
+
+    monkeypatch.setattr(server, "score_summaries", scoring)
+    response = api_client.post("/api/news/stream", json={"company_name": "Acme"})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["type"] for event in events] == ["article"] * 4 + ["analysis"]
+    assert len(threads) == 4 and all(name.startswith("nlp") for name in threads)
+    # The stream gave its slot back
+    pools.reserve().release()
+    pools.shutdown()
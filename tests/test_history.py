@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+import executors
+import history
+from history import HistoryStore
+
+DAY = 86400
+
+
+def _article(title, sentiment, compound, topics, link=None):
+    return {
+        "Title": title,
+        "Link": link or f"https://example.com/{title.replace(' ', '-')}",
+        "Sentiment": sentiment,
+        "Scores": {"Polarity": compound / 2, "Compound": compound},
+        "Topics": topics,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+def test_articles_are_recorded_once(store):
+    articles = [_article("Up", "Positive", 0.6, ["Rockets"]), _article("Down", "Negative", -0.4, ["Anvils"])]
+    assert store.record("Acme", articles, fetched_at=1000) == 2
+    # Seen again later, under another spelling of the company
+    assert store.record(" ACME ", articles, fetched_at=2000) == 0
+    assert store.record("Globex", articles, fetched_at=2000) == 2
+
+
+def test_trend_buckets_and_counts(store):
+    store.record("Acme", [_article("a", "Positive", 0.5, ["Rockets"])], fetched_at=10 * DAY + 100)
+    store.record("Acme", [_article("b", "Negative", -0.5, ["Anvils"])], fetched_at=10 * DAY + 200)
+    store.record("Acme", [_article("c", "Neutral", 0.0, ["Rockets"])], fetched_at=12 * DAY)
+
+    trend = store.trend("acme", since=0, bucket="day")
+    assert [row["bucket_start"] for row in trend] == [10 * DAY, 12 * DAY]
+    assert trend[0]["articles"] == 2
+    assert (trend[0]["positive"], trend[0]["negative"], trend[0]["neutral"]) == (1, 1, 0)
+    assert trend[0]["mean_compound"] == pytest.approx(0.0)
+    assert trend[1]["neutral"] == 1
+
+    assert store.trend("Acme", since=11 * DAY) == [trend[1]]
+    assert [row["articles"] for row in store.trend("Acme", bucket="week")] == [3]
+
+
+def test_trend_by_topic_and_top_topics(store):
+    store.record("Acme", [
+        _article("a", "Positive", 0.8, ["Rockets", "Earnings"]),
+        _article("b", "Positive", 0.4, ["Rockets"]),
+        _article("c", "Negative", -0.6, ["Anvils"]),
+    ], fetched_at=5 * DAY)
+
+    rockets = store.trend("Acme", topic="Rockets")
+    assert rockets[0]["articles"] == 2
+    assert rockets[0]["mean_compound"] == pytest.approx(0.6)
+
+    topics = store.topics("Acme")
+    assert topics[0] == {"topic": "Rockets", "articles": 2, "mean_compound": pytest.approx(0.6)}
+    assert [topic["topic"] for topic in topics] == ["Rockets", "Anvils", "Earnings"]
+    assert len(store.topics("Acme", limit=1)) == 1
+
+
+def test_record_analysis_is_best_effort(monkeypatch, capsys):
+    def broken_store():
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(history, "get_history_store", broken_store)
+    assert history.record_analysis({"Company": "Acme", "Articles": []}) == 0
+    assert "read-only file system" in capsys.readouterr().out
+
+
+def test_record_analysis_disabled(monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_DB", None)
+    monkeypatch.setattr(history, "_history_store", None)
+    assert history.record_analysis({"Company": "Acme", "Articles": []}) == 0
+
+
+def test_news_request_is_recorded_and_served(api_client):
+    assert api_client.post("/api/news", json={"company_name": "Acme"}).status_code == 200
+
+    response = api_client.get("/api/history/acme", params={"days": 1, "bucket": "hour"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["bucket"] == "hour"
+    assert sum(row["articles"] for row in body["trend"]) == 4
+    assert body["since"] == pytest.approx(time.time() - DAY, abs=60)
+    assert body["topics"][0]["topic"] == "Acme"
+
+
+def test_history_rejects_unknown_bucket(api_client):
+    assert api_client.get("/api/history/acme", params={"bucket": "month"}).status_code == 400
+
+
+def test_history_disabled_is_404(api_client, monkeypatch):
+    monkeypatch.setattr(history, "_history_store", None)
+    monkeypatch.setattr(history, "HISTORY_DB", None)
+    assert api_client.get("/api/history/acme").status_code == 404
+
+
+def test_failing_history_does_not_fail_the_analysis(api_client, monkeypatch):
+    def broken_store():
+        raise OSError("unable to open database file")
+
+    monkeypatch.setattr(history, "get_history_store", broken_store)
+    assert api_client.post("/api/news", json={"company_name": "Acme"}).status_code == 200
+    assert api_client.post("/api/news/batch", json={"company_names": ["Globex"]}).status_code == 200
+
+
+def test_recording_does_not_take_a_worker_slot(api_client, monkeypatch):
+    pools = executors.get_worker_pools()
+    run_io = pools.run_io
+
+    async def busy_for_history(fn, *args):
+        # A full queue must not turn finished work into a 503
+        if fn is history.record_analysis:
+            raise executors.Overloaded("Server is busy, try again shortly")
+        return await run_io(fn, *args)
+
+    monkeypatch.setattr(pools, "run_io", busy_for_history)
+    assert api_client.post("/api/news", json={"company_name": "Acme"}).status_code == 200
+    assert api_client.post("/api/news/batch", json={"company_names": ["Globex"]}).status_code == 200
+    assert sum(row["articles"] for row in api_client.history_store.trend("Acme")) == 4
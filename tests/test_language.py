@@ -0,0 +1,83 @@
+import string
+
+import pytest
+
+from language import (CATALOGS, DEFAULT_LANGUAGE, LANGUAGE_CODES, SENTIMENT_CATEGORIES, get_messages, get_voice,
+                      parse_sentiment_analysis, render_sentiment, translate_sentiment_analysis,
+                      translate_summary)
+
+LANGUAGES = sorted(CATALOGS)
+
+
+def _fields(template):
+    return {name for _, name, _, _ in string.Formatter().parse(template) if name}
+
+
+@pytest.mark.parametrize("language_code", LANGUAGES)
+def test_catalog_uses_the_same_placeholders_as_english(language_code):
+    english = CATALOGS[DEFAULT_LANGUAGE]["messages"]
+    for message_id, template in CATALOGS[language_code]["messages"].items():
+        assert _fields(template) == _fields(english[message_id]), (language_code, message_id)
+
+
+def test_language_menu_lists_every_catalog():
+    assert sorted(language["code"] for language in LANGUAGE_CODES.values()) == LANGUAGES
+
+
+
+def test_sentiment_categories_are_defined_once():
+    import sentiment
+    from language import SentimentCategory
+
+    assert sentiment.SentimentCategory is SentimentCategory
+    assert SENTIMENT_CATEGORIES == tuple(category.value for category in SentimentCategory)
+
+
+def test_voices_come_from_the_catalogs(monkeypatch):
+    from text_to_speech import EspeakBackend
+
+    assert get_voice("en-US", "espeak") == "en-us"
+    assert get_voice("hi", "gtts") is None
+    espeak = EspeakBackend()
+    assert all(espeak.supports(code) for code in LANGUAGES)
+    assert not espeak.supports("fr")
+    # A new catalog is all it takes to add a language
+    monkeypatch.setitem(CATALOGS, "fr", {"name": "French", "order": 7, "messages": {}, "voices": {"espeak": "fr"}})
+    assert espeak.supports("fr-FR")
+@pytest.mark.parametrize("category", SENTIMENT_CATEGORIES)
+def test_english_sentence_round_trips(category):
+    sentence = render_sentiment(category, "Q3 earnings, guidance", DEFAULT_LANGUAGE)
+    assert parse_sentiment_analysis(sentence) == (category, "Q3 earnings, guidance")
+
+
+@pytest.mark.parametrize("language_code", LANGUAGES)
+@pytest.mark.parametrize("category", SENTIMENT_CATEGORIES)
+def test_prose_and_verdict_render_the_same(language_code, category):
+    english = render_sentiment(category, "Batteries", DEFAULT_LANGUAGE)
+    translated = translate_sentiment_analysis(english, language_code)
+    assert translated == render_sentiment(category, "Batteries", language_code)
+    assert "Batteries" in translated
+
+
+def test_unrecognized_sentence_is_returned_unchanged():
+    assert translate_sentiment_analysis("Something else entirely.", "hi") == "Something else entirely."
+
+
+def test_regional_and_unknown_codes_fall_back():
+    assert get_messages("hi-IN") is get_messages("hi")
+    assert get_messages("xx") is get_messages(DEFAULT_LANGUAGE)
+
+
+def test_translate_summary_fills_every_field():
+    processed_data = {
+        "Company": "Acme",
+        "Articles": [{}, {}],
+        "Comparative Sentiment Score": {
+            "Sentiment Distribution": {"Positive": 1, "Negative": 1, "Neutral": 0},
+            "Topic Overlap": {"Common Topics": []},
+        },
+        "Final Sentiment Analysis": "",
+        "Sentiment Verdict": {"Category": "mixed_neutral", "Focus Topic": "Anvils"},
+    }
+    summary = translate_summary(processed_data, "en")
+    assert "Acme" in summary and "Anvils" in summary and "No common topics found" in summary
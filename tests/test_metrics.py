@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+import executors
+import metrics
+import server
+from executors import WorkerPools
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh metrics registry, with metrics enabled for the worker pools"""
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, "_registry", registry)
+    monkeypatch.setattr(executors, "METRICS_ENABLED", True)
+    return registry
+
+
+def scored_job():
+    with metrics._Stage("sentiment"):
+        pass
+    return "done"
+
+
+def failing_job():
+    with metrics._Stage("sentiment"):
+        pass
+    with metrics._Stage("topics"):
+        raise ValueError("no model")
+
+
+def _counter(registry, name, stage):
+    return registry._values.get((name, (("stage", stage),)))
+
+
+@pytest.mark.parametrize("nlp_executor", ["thread", "process"])
+def test_pool_timings_and_errors_reach_the_caller(registry, nlp_executor):
+    # Results and exceptions cross a process boundary, without loading the NLP models
+    pools = WorkerPools(io_workers=1, nlp_workers=1, nlp_executor=nlp_executor, warm_up_models=False)
+
+    async def run():
+        timings, token = metrics.begin_request()
+        try:
+            assert await pools.run_nlp(scored_job) == "done"
+            with pytest.raises(ValueError, match="no model"):
+                await pools.run_nlp(failing_job)
+        finally:
+            metrics.end_request(token)
+        return timings
+
+    try:
+        timings = asyncio.run(run())
+    finally:
+        pools.shutdown()
+    assert [name for name, _ in timings] == ["sentiment", "sentiment", "topics"]
+    assert _counter(registry, "news_stage_errors_total", "topics") == 1
+    assert _counter(registry, "news_stage_seconds", "sentiment").count == 2
+
+
+def test_stream_ends_with_the_request_timings(api_client, monkeypatch):
+    timings = [("fetch", 0.25)]
+    monkeypatch.setattr(server, "request_timings", lambda: timings)
+    lines = api_client.post("/api/news/stream", json={"company_name": "Acme"}).text.splitlines()
+    events = [json.loads(line) for line in lines]
+    assert [event["type"] for event in events[-2:]] == ["analysis", "timing"]
+    assert events[-1]["server_timing"].startswith("fetch;dur=250.0, ")
+    assert events[-1]["server_timing"].split(", ")[-1].startswith("total;dur=")
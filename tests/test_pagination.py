@@ -0,0 +1,215 @@
+import asyncio
+import http.server
+import threading
+import time
+import urllib.parse
+
+import httpx
+import pytest
+
+import news
+from news import PAGE_SIZE, fetch_news_articles, get_news_articles
+
+
+class SearchHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves numbered results pages. The first card of every page after the first
+    repeats the last card of the previous page, as Bing's pages overlap, so
+    page p holds stories 9p to 9p + 9. Pages past server.last_page repeat the last page.
+
+    Before serving a page, the handler answers with the statuses queued in
+    server.errors[page], or drops the connection while server.dropped[page]
+    is positive. Every response takes server.delay seconds.
+    """
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        first = int(query.get("first", ["1"])[0])
+        page = (first - 1) // PAGE_SIZE
+        with self.server.lock:
+            self.server.requested.append(page)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            status = self.server.errors[page].pop(0) if self.server.errors.get(page) else None
+            drop = self.server.dropped.get(page, 0) > 0
+            if drop:
+                self.server.dropped[page] -= 1
+        try:
+            time.sleep(self.server.delay)
+            if drop:
+                # Close without answering, which the client sees as a transport error
+                self.close_connection = True
+                return
+            if status is None and page in self.server.failing_pages:
+                status = 404
+            if status is not None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send_page(page, query["q"][0])
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _send_page(self, page, search_query):
+        page = min(page, self.server.last_page)
+        cards = []
+        for i in range(PAGE_SIZE):
+            number = page * (PAGE_SIZE - 1) + i
+            cards.append(
+                f'<div class="news-card"><a class="title" href="https://example.com/{number}">Story {number}</a>'
+                f'<div class="snippet">Summary {number} for {search_query}</div></div>'
+            )
+        body = f"<html><body>{''.join(cards)}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def search_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SearchHandler)
+    server.requested = []
+    server.failing_pages = set()
+    server.errors = {}
+    server.dropped = {}
+    server.delay = 0
+    server.in_flight = server.max_in_flight = 0
+    server.lock = threading.Lock()
+    server.last_page = 100
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/news/search"
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch_async(query, num_articles, search_url, max_pages=news.MAX_PAGES):
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await fetch_news_articles(query, num_articles, search_url, client=client, max_pages=max_pages)
+    return asyncio.run(run())
+
+
+FETCHERS = {
+    "sync": lambda query, num_articles, url, **kwargs: get_news_articles(query, num_articles, url, **kwargs),
+    "async": fetch_async,
+}
+
+
+@pytest.fixture(params=list(FETCHERS))
+def fetch(request):
+    return FETCHERS[request.param]
+
+
+def _numbers(articles):
+    return [int(article["Title"].split()[-1]) for article in articles]
+
+
+def test_single_page_is_enough(fetch, search_server):
+    articles = fetch("Acme", 10, search_server.url)
+    assert _numbers(articles) == list(range(10))
+    assert search_server.requested == [0]
+
+
+def test_collects_unique_articles_across_pages(fetch, search_server):
+    articles = fetch("Acme", 35, search_server.url)
+    # The repeated card at the top of each page is skipped
+    assert _numbers(articles) == list(range(35))
+    assert len({(article["Title"], article["Summary"]) for article in articles}) == 35
+
+
+def test_stops_once_enough_articles_are_collected(fetch, search_server, monkeypatch):
+    monkeypatch.setattr(news, "PAGE_CONCURRENCY", 2)
+    fetch("Acme", 25, search_server.url)
+    # 10 from the first page, 9 new per page after it: pages 1 and 2 reach 25
+    assert sorted(search_server.requested) == [0, 1, 2]
+
+
+def test_stops_when_pages_bring_nothing_new(fetch, search_server):
+    search_server.last_page = 1
+    articles = fetch("Acme", 100, search_server.url)
+    assert _numbers(articles) == list(range(19))
+    # The wave holding the last distinct page, then one more that brings nothing new
+    assert max(search_server.requested) == 2 * news.PAGE_CONCURRENCY
+
+
+def test_max_pages_is_respected(fetch, search_server):
+    articles = fetch("Acme", 100, search_server.url, max_pages=3)
+    assert len(articles) == 28
+    assert sorted(search_server.requested) == [0, 1, 2]
+
+
+def test_failed_first_page_returns_nothing(fetch, search_server):
+    search_server.failing_pages = {0}
+    assert fetch("Acme", 30, search_server.url) == []
+    assert search_server.requested == [0]
+
+
+def test_failed_later_pages_are_skipped(fetch, search_server):
+    search_server.failing_pages = {1}
+    articles = fetch("Acme", 30, search_server.url)
+    numbers = _numbers(articles)
+    assert len(numbers) == len(set(numbers)) == 30
+    assert not set(range(10, 18)) & set(numbers)
+
+
+def test_page_offsets():
+    assert news._page_params("Acme", 0) == {"q": "Acme"}
+    assert news._page_params("Acme", 2) == {"q": "Acme", "first": 2 * PAGE_SIZE + 1}
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(news, "BACKOFF_FACTOR", 0.01)
+    monkeypatch.setattr(news, "MAX_RETRIES", 2)
+
+
+@pytest.mark.parametrize("statuses", [[429], [503, 500], [502, 504]])
+def test_rate_limits_and_server_errors_are_retried(search_server, fast_retries, statuses):
+    search_server.errors = {0: list(statuses)}
+    assert _numbers(fetch_async("Acme", 10, search_server.url)) == list(range(10))
+    assert search_server.requested == [0] * (len(statuses) + 1)
+
+
+def test_retries_give_up_after_max_retries(search_server, fast_retries):
+    search_server.errors = {0: [503, 503, 503, 503]}
+    assert fetch_async("Acme", 10, search_server.url) == []
+    assert search_server.requested == [0, 0, 0]
+
+
+def test_transport_errors_are_retried(search_server, fast_retries):
+    search_server.dropped = {0: 2}
+    assert _numbers(fetch_async("Acme", 10, search_server.url)) == list(range(10))
+    assert search_server.requested == [0, 0, 0]
+
+
+def test_not_found_is_not_retried(search_server, fast_retries):
+    search_server.errors = {0: [404, 503]}
+    assert fetch_async("Acme", 10, search_server.url) == []
+    assert search_server.requested == [0]
+
+
+def test_fetch_many_limits_concurrency_and_keeps_results_per_query(search_server):
+    search_server.delay = 0.05
+    queries = [f"Company {i}" for i in range(6)]
+
+    async def run():
+        try:
+            return await news.fetch_many(queries, 5, max_concurrency=2, search_url=search_server.url)
+        finally:
+            await news.close_async_client()
+
+    results = asyncio.run(run())
+    assert search_server.max_in_flight == 2
+    assert list(results) == queries
+    for query, articles in results.items():
+        assert _numbers(articles) == list(range(5))
+        assert all(article["Summary"].endswith(f"for {query}") for article in articles)
@@ -0,0 +1,94 @@
+import importlib
+
+import pytest
+
+import parsers
+from news import parse_news_articles
+
+EXPECTED = [
+    {
+        "Title": "Acme beats quarterly estimates",
+        "Link": "https://example.com/acme-earnings",
+        "Summary": "Acme reported record revenue as demand for its rockets grew.",
+    },
+    {
+        "Title": "Acme recalls faulty anvils",
+        "Link": "https://example.com/acme-recall",
+        "Summary": "The recall affects about 40,000 units sold in Europe.",
+    },
+    {
+        "Title": "Acme eröffnet Werk in München – Café-Gespräch",
+        "Link": "https://example.com/acme-munchen",
+        "Summary": "Die Produktion soll im Frühjahr beginnen.",
+    },
+    {
+        "Title": "Acme names new chief executive",
+        "Link": "https://example.com/acme-ceo",
+        "Summary": "No summary available",
+    },
+    {
+        "Title": "Analysts split on Acme outlook",
+        "Link": "https://example.com/acme-fallback",
+        "Summary": "Some expect margins to shrink next year.",
+    },
+]
+
+
+def _backend(name):
+    pytest.importorskip(parsers._BACKEND_MODULES[name])
+    return parsers.PARSERS[name]
+
+
+@pytest.fixture(params=list(parsers.PARSERS))
+def backend(request):
+    return _backend(request.param)
+
+
+def test_backend_parses_fixture_bytes(backend, bing_page):
+    assert backend(bing_page, 10) == EXPECTED
+
+
+def test_backend_parses_fixture_str(backend, bing_page):
+    assert backend(bing_page.decode("utf-8"), 10) == EXPECTED
+
+
+def test_backends_agree(bing_page):
+    results = {}
+    for name in parsers.PARSERS:
+        try:
+            importlib.import_module(parsers._BACKEND_MODULES[name])
+        except ImportError:
+            continue
+        results[name] = parsers.PARSERS[name](bing_page, 10)
+    if len(results) < 2:
+        pytest.skip("fewer than two parser backends are installed")
+    first = next(iter(results.values()))
+    assert all(articles == first for articles in results.values()), results
+
+
+def test_backend_respects_num_articles(backend, bing_page):
+    assert backend(bing_page, 2) == EXPECTED[:2]
+
+
+@pytest.mark.parametrize("html", [b"", "", b"  \n ", "<!-- nothing here -->"])
+def test_backend_handles_empty_documents(backend, html):
+    assert backend(html, 10) == []
+
+
+def test_backend_accepts_str_with_encoding_declaration(backend):
+    html = (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<html><body><div class="news-card"><a class="title" href="https://example.com/a">Naïve title</a>'
+        '<div class="snippet">Snippet</div></div></body></html>'
+    )
+    assert backend(html, 10) == [{"Title": "Naïve title", "Link": "https://example.com/a", "Summary": "Snippet"}]
+
+
+@pytest.mark.parametrize("html", [None, b"", "   "])
+def test_parse_news_articles_empty_page(html):
+    assert parse_news_articles(html, 10) == []
+
+
+def test_get_parser_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        parsers.get_parser("regex")
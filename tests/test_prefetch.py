@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+import prefetch
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Replace rendering with a stub that blocks until released, recording each language"""
+    release = threading.Event()
+    rendered = []
+
+    def render(job, processed_data, language_code):
+        release.wait(5)
+        rendered.append(language_code)
+        return language_code
+
+    monkeypatch.setattr(prefetch, "_render", render)
+    monkeypatch.setattr(prefetch, "_executor", None)
+    monkeypatch.setattr(prefetch, "_jobs", {})
+    monkeypatch.setattr(prefetch, "_pending", 0)
+    monkeypatch.setattr(prefetch, "AUDIO_PREFETCH_WORKERS", 1)
+    yield release, rendered
+    release.set()
+    prefetch._get_executor().shutdown(wait=True)
+
+
+def _wait(job):
+    wait(job.futures, timeout=5)
+    # Done callbacks run just after waiters are woken
+    deadline = time.monotonic() + 5
+    while prefetch._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_languages_beyond_the_queue_limit_are_skipped(renders, monkeypatch):
+    release, rendered = renders
+    monkeypatch.setattr(prefetch, "AUDIO_PREFETCH_MAX_PENDING", 3)
+
+    first = prefetch.prefetch_audio({}, "s1", ["en", "hi", "es", "fr"])
+    second = prefetch.prefetch_audio({}, "s2", ["de"])
+    assert len(first.futures) == 3
+    assert second.futures == []
+
+    release.set()
+    _wait(first)
+    assert sorted(rendered) == ["en", "es", "hi"]
+    assert prefetch._pending == 0
+    # Room again once the queue drained
+    assert len(prefetch.prefetch_audio({}, "s2", ["de"]).futures) == 1
+
+
+def test_new_prefetch_cancels_the_same_session(renders):
+    release, rendered = renders
+    first = prefetch.prefetch_audio({}, "s1", ["en", "hi", "es"])
+    second = prefetch.prefetch_audio({}, "s1", ["fr"])
+
+    assert first.cancelled.is_set()
+    assert prefetch._jobs["s1"] is second
+    release.set()
+    _wait(second)
+    # "en" may already have been running; queued languages never start
+    assert "es" not in rendered and "fr" in rendered
+
+
+def test_sessionless_prefetches_do_not_cancel_each_other(renders):
+    release, _ = renders
+    first = prefetch.prefetch_audio({}, None, ["en", "hi"])
+    second = prefetch.prefetch_audio({}, None, ["es"])
+
+    assert not first.cancelled.is_set()
+    assert None not in prefetch._jobs
+    assert prefetch.cancel_prefetch(None) is False
+    release.set()
+    _wait(first)
+    _wait(second)
+    assert all(not future.cancelled() for future in first.futures + second.futures)
+
+
+def test_cancel_prefetch(renders):
+    release, _ = renders
+    job = prefetch.prefetch_audio({}, "s1", ["en", "hi"])
+    assert prefetch.cancel_prefetch("s1") is True
+    assert job.cancelled.is_set()
+    assert prefetch.cancel_prefetch("s1") is False
+    release.set()
+    _wait(job)
+    assert prefetch._pending == 0
@@ -0,0 +1,42 @@
+import pickle
+
+from records import AnalysisResult, ProcessedArticle, dumps, loads
+
+
+def test_pipeline_returns_records(stub_nlp, news_articles):
+    from sentiment import iter_news_analysis, process_news_articles, process_news_batch
+
+    result = process_news_articles("Acme", news_articles["acme"])
+    assert isinstance(result, AnalysisResult)
+    assert all(isinstance(article, ProcessedArticle) for article in result.articles)
+    assert [article.sentiment for article in result.articles] == ["Positive", "Negative", "Neutral", "Positive"]
+
+    batch = process_news_batch({"Acme": news_articles["acme"], "Globex": news_articles["globex"]})
+    assert batch["Acme"].to_dict() == result.to_dict()
+    assert len(batch["Globex"].articles) == 3
+
+    events = list(iter_news_analysis("Acme", news_articles["acme"]))
+    assert events[-1]["result"].to_dict() == result.to_dict()
+
+
+def test_to_dict_keeps_the_api_shape(stub_nlp, news_articles):
+    from sentiment import process_news_articles
+
+    processed_data = process_news_articles("Acme", news_articles["acme"]).to_dict()
+    assert list(processed_data) == [
+        "Company", "Articles", "Comparative Sentiment Score", "Final Sentiment Analysis", "Sentiment Verdict"
+    ]
+    article = processed_data["Articles"][0]
+    assert list(article) == ["Title", "Link", "Summary", "Sentiment", "Scores", "Topics"]
+    assert article["Scores"] == {"Polarity": 0.5, "Compound": 0.5}
+    assert AnalysisResult.from_dict(processed_data).to_dict() == processed_data
+
+
+def test_records_serialize_and_pickle(stub_nlp, news_articles):
+    from sentiment import process_news_articles
+
+    result = process_news_articles("Acme", news_articles["acme"])
+    # Nested records serialize in their API shape
+    assert loads(dumps({"Acme": result})) == {"Acme": result.to_dict()}
+    # Results come back from process pool workers pickled
+    assert pickle.loads(pickle.dumps(result)) == result
@@ -0,0 +1,101 @@
+import pytest
+
+import server
+import text_to_speech
+from text_to_speech import TTSBackend, get_tts_backends
+
+
+class FakeBackend(TTSBackend):
+    def __init__(self, name, languages=None, fails=False, usable=True):
+        self.name = name
+        self.languages = languages
+        self.fails = fails
+        self.usable = usable
+        self.calls = []
+
+    def available(self):
+        return self.usable
+
+    def supports(self, language_code):
+        return self.languages is None or language_code in self.languages
+
+    def synthesize(self, text, language_code, output_file):
+        self.calls.append(language_code)
+        if self.fails:
+            raise RuntimeError(f"{self.name} failed")
+        with open(output_file, "w") as f:
+            f.write(self.name)
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    backends = {
+        "first": FakeBackend("first"),
+        "second": FakeBackend("second"),
+        "local": FakeBackend("local", languages={"kn", "hi"}),
+        "offline": FakeBackend("offline", usable=False),
+    }
+    for module in (text_to_speech, server):
+        monkeypatch.setattr(module, "TTS_BACKENDS", backends)
+    monkeypatch.setattr(text_to_speech, "TTS_BACKEND_ORDER", ["first", "second", "local", "offline"])
+    monkeypatch.setattr(text_to_speech, "TTS_LANGUAGE_BACKENDS", {"kn": "local"})
+    return backends
+
+
+def _names(engines):
+    return [engine.name for engine in engines]
+
+
+def test_fallback_order(backends):
+    # The configured order, without engines that are unusable or lack the language
+    assert _names(get_tts_backends("hi")) == ["first", "second", "local"]
+    assert _names(get_tts_backends("te")) == ["first", "second"]
+    # A per-language preference comes before the configured order
+    assert _names(get_tts_backends("kn")) == ["local", "first", "second"]
+    # A per-request backend comes before both
+    assert _names(get_tts_backends("kn", "second")) == ["second", "local", "first"]
+    assert _names(get_tts_backends("kn", "offline")) == ["local", "first", "second"]
+    with pytest.raises(ValueError, match="Unknown text-to-speech backend"):
+        get_tts_backends("kn", "missing")
+
+
+def test_next_engine_runs_after_a_failure(backends, tmp_path):
+    backends["local"].fails = True
+    output_file = str(tmp_path / "speech.mp3")
+    assert text_to_speech.text_to_speech("Namaskara", "kn", output_file) == output_file
+    with open(output_file) as f:
+        assert f.read() == "first"
+    assert backends["local"].calls == ["kn"]
+
+    for engine in backends.values():
+        engine.fails = True
+    with pytest.raises(RuntimeError, match="second failed"):
+        text_to_speech.text_to_speech("Namaskara", "kn", output_file)
+
+
+def test_no_usable_engine(backends):
+    backends["first"].usable = backends["second"].usable = False
+    with pytest.raises(RuntimeError, match="No text-to-speech backend available"):
+        get_tts_backends("te")
+
+
+def test_backends_must_implement_synthesize():
+    class Silent(TTSBackend):
+        name = "silent"
+
+    with pytest.raises(TypeError):
+        Silent()
+
+
+def test_audio_api_falls_back_and_rejects_unknown_backends(api_client, backends):
+    analysis_id = api_client.post("/api/news", json={"company_name": "Acme"}).json()["analysis_id"]
+    backends["second"].fails = True
+
+    response = api_client.post("/api/audio", json={"analysis_id": analysis_id, "language_code": "hi", "backend": "second"})
+    assert response.status_code == 200
+    assert api_client.get(response.json()["audio_url"]).content == b"first"
+    assert backends["second"].calls == ["hi"]
+
+    response = api_client.post("/api/audio", json={"analysis_id": analysis_id, "language_code": "hi", "backend": "missing"})
+    assert response.status_code == 422
+    assert "missing" in response.json()["detail"]
@@ -0,0 +1,54 @@
+import pytest
+import spacy
+from spacy.language import Language
+
+import sentiment
+
+TEXTS = [
+    "Acme Rockets reported record earnings in Berlin, and Acme shares rallied.",
+    "Globex faces a lawsuit over its battery recall in Europe.",
+    "",
+    "Quarterly guidance from Initech disappointed analysts; Initech cut hiring plans.",
+    "Acme and Globex announced a joint venture in Europe.",
+]
+
+
+@Language.component("fake_parser")
+def fake_parser(doc):
+    # Stands in for the tagger, parser and lemmatizer of a trained pipeline
+    for token in doc:
+        token.lemma_ = token.lower_
+        token.pos_ = "PROPN" if token.is_title else "NOUN" if token.is_alpha else "PUNCT"
+        token.dep_ = "nsubj" if token.is_alpha else "punct"
+    return doc
+
+
+@pytest.fixture
+def blank_nlp(monkeypatch):
+    nlp = spacy.blank("en")
+    # Named like the components they replace, which extract_topics keeps enabled
+    nlp.add_pipe("fake_parser", name="parser")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([
+        {"label": "ORG", "pattern": "Acme Rockets"},
+        {"label": "ORG", "pattern": "Acme"},
+        {"label": "ORG", "pattern": "Globex"},
+        {"label": "ORG", "pattern": "Initech"},
+        {"label": "GPE", "pattern": "Berlin"},
+        {"label": "GPE", "pattern": "Europe"},
+    ])
+    monkeypatch.setattr(sentiment, "get_nlp", lambda: nlp)
+    return nlp
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 64])
+def test_batch_topics_match_one_text_at_a_time(blank_nlp, batch_size):
+    expected = [sentiment.extract_topics(text) for text in TEXTS]
+    assert sentiment.extract_topics_batch(TEXTS, batch_size=batch_size) == expected
+    # The entity ruler's organizations lead the topics
+    assert expected[0][:2] == ["Acme Rockets", "Berlin"]
+
+
+def test_batch_topics_with_several_processes(blank_nlp):
+    expected = [sentiment.extract_topics(text, num_topics=2) for text in TEXTS]
+    assert sentiment.extract_topics_batch(TEXTS, n_process=2, batch_size=2, num_topics=2) == expected
@@ -0,0 +1,39 @@
+import pytest
+
+utils = pytest.importorskip("utils")
+
+
+def test_posts_are_not_retried_on_503():
+    retry = utils.APIClient("http://localhost:8000/api", retries=2).session.get_adapter("http://x").max_retries
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+
+
+def test_in_process_news_and_audio(api_client, monkeypatch):
+    import server
+
+    def render_audio(processed_data, language_code, backend=None):
+        return {"audio_id": "0" * 64, "summary_text": processed_data["Company"], "language_name": language_code}
+
+    monkeypatch.setattr(server, "render_audio", render_audio)
+    ok, processed_data = utils.fetch_news_data(utils.IN_PROCESS_API, "Acme")
+    assert ok and processed_data["Company"] == "Acme"
+    assert len(processed_data["Articles"]) == 4
+
+    ok, audio = utils.generate_audio_summary(utils.IN_PROCESS_API, processed_data, "hi")
+    assert ok and audio["summary_text"] == "Acme"
+
+
+def test_in_process_news_reports_missing_company(api_client):
+    ok, error = utils.fetch_news_data(utils.IN_PROCESS_API, "Initech")
+    assert not ok and "No news articles" in error
+
+
+def test_in_process_audio_download(api_client):
+    audio_id = "d" * 64
+    api_client.audio_store.get_or_create(audio_id, lambda path: open(path, "wb").write(b"mp3"))
+
+    assert utils.fetch_audio(utils.IN_PROCESS_API, audio_id) == (True, b"mp3")
+    # Only IDs the server would accept are looked up
+    assert utils.fetch_audio(utils.IN_PROCESS_API, "D" * 64)[0] is False
+    assert utils.fetch_audio(utils.IN_PROCESS_API, "e" * 64)[0] is False
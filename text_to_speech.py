@@ -1,33 +1,206 @@
 import tempfile
 import os
-from gtts import gTTS
-from IPython.display import Audio, display
-from language import translate_summary, LANGUAGE_CODES
+import shutil
+import subprocess
+from abc import ABC, abstractmethod
+from language import get_voice, translate_summary, LANGUAGE_CODES
+from audio_store import audio_key, get_audio_store
+from metrics import stage, timed
 
-def text_to_speech(text, language_code, output_file=None):
+# Backends to try, in order, when a request does not ask for a specific one
+TTS_BACKEND_ORDER = [name.strip() for name in os.getenv("TTS_BACKEND_ORDER", "gtts,espeak").split(",") if name.strip()]
+
+# Preferred backend per language, e.g. TTS_LANGUAGE_BACKENDS="kn:espeak,ta:espeak"
+TTS_LANGUAGE_BACKENDS = dict(
+    item.split(":", 1) for item in os.getenv("TTS_LANGUAGE_BACKENDS", "").split(",") if ":" in item
+)
+
+
+class TTSBackend(ABC):
     """
-    Convert text to speech using gTTS in the specified language
+    Base class for text-to-speech engines
+    
+    Subclasses set a name and implement synthesize(), which writes MP3 audio
+    to the given path.
+    """
+    name = None
+    
+    def available(self):
+        """Whether the engine can be used in this environment"""
+        return True
+    
+    def supports(self, language_code):
+        """Whether the engine can speak the given language"""
+        return True
+    
+    def voice_settings(self):
+        """Options that change the generated audio, part of the audio cache key"""
+        return {"engine": self.name}
+    
+    @abstractmethod
+    def synthesize(self, text, language_code, output_file):
+        """Write the spoken text as MP3 audio to output_file, raising on failure"""
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate text-to-speech, needs network access"""
+    name = "gtts"
+    
+    def __init__(self, slow=False):
+        self.slow = slow
+    
+    def available(self):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def voice_settings(self):
+        return {"engine": self.name, "slow": self.slow}
+    
+    def synthesize(self, text, language_code, output_file):
+        from gtts import gTTS
+        
+        # Create gTTS object with specified language
+        tts = gTTS(text=text, lang=language_code, slow=self.slow)
+        
+        # Save the audio file
+        tts.save(output_file)
+
+
+class EspeakBackend(TTSBackend):
+    """Local offline synthesis with espeak-ng, encoded to MP3 with ffmpeg"""
+    name = "espeak"
+    
+    def __init__(self, speed=160):
+        self.speed = speed
+    
+    def available(self):
+        return bool(shutil.which("espeak-ng") and shutil.which("ffmpeg"))
+    
+    def supports(self, language_code):
+        # Voice names come from the "voices" of each language catalog in translations/
+        return get_voice(language_code, self.name) is not None
+    
+    def voice_settings(self):
+        return {"engine": self.name, "speed": self.speed}
+    
+    def synthesize(self, text, language_code, output_file):
+        fd, wav_file = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            # Text goes through stdin so long summaries are not limited by argv size
+            subprocess.run(
+                ["espeak-ng", "-v", get_voice(language_code, self.name), "-s", str(self.speed), "-w", wav_file, "--stdin"],
+                input=text.encode("utf-8"), check=True, capture_output=True
+            )
+            subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error", "-i", wav_file, "-f", "mp3", output_file],
+                check=True, capture_output=True
+            )
+        finally:
+            os.remove(wav_file)
+
+
+TTS_BACKENDS = {
+    "gtts": GTTSBackend(),
+    "espeak": EspeakBackend()
+}
+
+
+def get_tts_backends(language_code, backend=None):
+    """
+    Backends to try for a language, in fallback order
+    
+    Parameters:
+    language_code (str): Language code
+    backend (str, optional): Backend requested by the caller, tried first
+    
+    Returns:
+    list: Usable TTSBackend instances
+    """
+    names = [backend, TTS_LANGUAGE_BACKENDS.get(language_code)] + TTS_BACKEND_ORDER
+    if backend is not None and backend not in TTS_BACKENDS:
+        raise ValueError(f"Unknown text-to-speech backend: {backend}")
+    
+    backends = []
+    for name in names:
+        engine = TTS_BACKENDS.get(name)
+        if engine is None or engine in backends:
+            continue
+        if engine.available() and engine.supports(language_code):
+            backends.append(engine)
+    
+    if not backends:
+        raise RuntimeError(f"No text-to-speech backend available for language: {language_code}")
+    return backends
+
+
+@timed("tts")
+def text_to_speech(text, language_code, output_file=None, backend=None):
+    """
+    Convert text to speech in the specified language
+    
+    Backends are tried in fallback order until one succeeds.
     
     Parameters:
     text (str): Text to convert to speech
-    language_code (str): Language code for gTTS
+    language_code (str): Language code
     output_file (str, optional): Path to save the audio file. If None, a temporary file will be created.
+    backend (str, optional): Name of the backend to try first, e.g. "gtts" or "espeak"
     
     Returns:
     str: Path to the generated audio file
     """
-    # If no output file is specified, create a temporary file
+    # If no output file is specified, create a uniquely named temporary file
+    # so concurrent calls never overwrite each other
     if output_file is None:
-        temp_dir = tempfile.gettempdir()
-        output_file = os.path.join(temp_dir, f"speech_{language_code}.mp3")
+        fd, output_file = tempfile.mkstemp(prefix=f"speech_{language_code}_", suffix=".mp3")
+        os.close(fd)
+    
+    error = None
+    for engine in get_tts_backends(language_code, backend):
+        try:
+            engine.synthesize(text, language_code, output_file)
+            return output_file
+        except Exception as e:
+            error = e
+    raise error
+
+
+def text_to_speech_cached(text, language_code, backend=None):
+    """
+    Convert text to speech, reusing earlier audio for the same text, language and voice
     
-    # Create gTTS object with specified language
-    tts = gTTS(text=text, lang=language_code, slow=False)
+    Concurrent calls for the same audio wait for a single synthesis. Backends
+    are tried in fallback order until one succeeds.
     
-    # Save the audio file
-    tts.save(output_file)
+    Parameters:
+    text (str): Text to convert to speech
+    language_code (str): Language code
+    backend (str, optional): Name of the backend to try first
     
-    return output_file
+    Returns:
+    tuple: (audio key, path to the audio file)
+    """
+    store = get_audio_store()
+    error = None
+    for engine in get_tts_backends(language_code, backend):
+        key = audio_key(text, language_code, engine.voice_settings())
+        try:
+            path = store.get_or_create(key, lambda output_file: _synthesize(engine, text, language_code, output_file))
+            return key, path
+        except Exception as e:
+            error = e
+    raise error
+
+
+
+def _synthesize(engine, text, language_code, output_file):
+    # Only audio that is not in the store yet gets here
+    with stage("tts"):
+        engine.synthesize(text, language_code, output_file)
 
 
 def generate_speech_for_analysis(processed_data):
@@ -47,7 +220,7 @@ def generate_speech_for_analysis(processed_data):
     
     # Get user choice
     while True:
-        language_choice = input("Enter your choice (1-6): ")
+        language_choice = input(f"Enter your choice (1-{len(LANGUAGE_CODES)}): ")
         if language_choice in LANGUAGE_CODES:
             break
         print("Invalid choice. Please try again.")
@@ -1,54 +1,226 @@
+import json
+import os
 import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def fetch_news_data(api_url, company_name):
+# Use this as the API URL to run the pipeline inside the Streamlit process, skipping HTTP
+IN_PROCESS_API = "inprocess"
+
+# Client settings: (connect, read) timeouts in seconds and retries for failed connections
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "120"))
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+
+class APIClient:
+    """Keep-alive HTTP session to the API server with timeouts and retries"""
+
+    def __init__(self, api_url, timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT), retries=API_RETRIES):
+        """
+        Parameters:
+        api_url (str): Base URL of the API, e.g. http://localhost:8000/api
+        timeout (tuple): (connect, read) timeouts in seconds
+        retries (int): Retries for connection errors, and for 502/503/504 responses to GET requests
+        """
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        # A 503 to a POST is the server shedding load; retrying it would only add to the load,
+        # so POSTs are retried only when the connection could not be made
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      allowed_methods=["GET"], respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path, payload, stream=False):
+        """Send a JSON POST request to an API path such as '/news'"""
+        return self.session.post(f"{self.api_url}{path}", json=payload, timeout=self.timeout, stream=stream)
+
+    def get(self, path, stream=False):
+        """Send a GET request to an API path such as '/audio/<id>'"""
+        return self.session.get(f"{self.api_url}{path}", timeout=self.timeout, stream=stream)
+
+@st.cache_resource
+def get_api_client(api_url):
+    """Return the API client for a base URL, shared across Streamlit reruns and sessions"""
+    return APIClient(api_url)
+
+def _error_detail(response, default):
+    try:
+        return response.json().get('detail', default)
+    except ValueError:
+        return default
+
+def fetch_news_data(api_url, company_name, session_id=None):
     """
     Fetch news data for a company from the API
-    
+
     Parameters:
-    api_url (str): API endpoint URL
+    api_url (str): API endpoint URL, or IN_PROCESS_API to run the pipeline directly
     company_name (str): Name of the company to analyze
-    
+    session_id (str, optional): Client session id, lets the API replace this session's audio prefetch
+
     Returns:
     tuple: (success (bool), data/error_message (dict/str))
     """
+    if api_url == IN_PROCESS_API:
+        return _fetch_news_in_process(company_name, session_id)
+
     try:
-        response = requests.post(
-            f"{api_url}/news",
-            json={"company_name": company_name}
+        response = get_api_client(api_url).post(
+            "/news",
+            {"company_name": company_name, "session_id": session_id}
         )
-        
+
         if response.status_code == 200:
             data = response.json()
             return True, data["processed_data"]
         else:
-            return False, f"Error: {response.json().get('detail', 'Failed to retrieve data')}"
+            return False, f"Error: {_error_detail(response, 'Failed to retrieve data')}"
     except Exception as e:
         return False, f"Connection error: {str(e)}"
 
-def generate_audio_summary(api_url, processed_data, language_code):
+def stream_news_data(api_url, company_name, session_id=None):
+    """
+    Stream news analysis events for a company from the API
+
+    Parameters:
+    api_url (str): API endpoint URL, or IN_PROCESS_API to run the pipeline directly
+    company_name (str): Name of the company to analyze
+    session_id (str, optional): Client session id, lets the API replace this session's audio prefetch
+
+    Yields:
+    dict: "article" events as articles are scored, then a final "analysis" event,
+    or an "error" event with a "detail" message. A server with metrics enabled
+    ends the stream with a "timing" event, which callers may ignore.
+    """
+    if api_url == IN_PROCESS_API:
+        yield from _stream_news_in_process(company_name, session_id)
+        return
+
+    try:
+        with get_api_client(api_url).post(
+            "/news/stream",
+            {"company_name": company_name, "session_id": session_id},
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                yield {"type": "error", "detail": f"Error: {_error_detail(response, 'Failed to retrieve data')}"}
+                return
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+    except Exception as e:
+        yield {"type": "error", "detail": f"Connection error: {str(e)}"}
+
+def generate_audio_summary(api_url, processed_data, language_code, analysis_id=None):
     """
     Generate audio summary in the specified language
-    
+
     Parameters:
-    api_url (str): API endpoint URL
-    processed_data (dict): Processed news data
+    api_url (str): API endpoint URL, or IN_PROCESS_API to run the pipeline directly
+    processed_data (dict): Processed news data, only sent when the server no longer has analysis_id
     language_code (str): Language code for the summary
-    
+    analysis_id (str, optional): ID of the analysis returned by the news endpoints
+
     Returns:
     tuple: (success (bool), data/error_message (dict/str))
     """
+    if api_url == IN_PROCESS_API:
+        return _generate_audio_in_process(processed_data, language_code, analysis_id)
+
     try:
-        response = requests.post(
-            f"{api_url}/audio",
-            json={
-                "processed_data": processed_data,
-                "language_code": language_code
-            }
-        )
-        
+        client = get_api_client(api_url)
+        response = None
+        if analysis_id:
+            response = client.post("/audio", {"analysis_id": analysis_id, "language_code": language_code})
+        if response is None or response.status_code == 404:
+            # The stored analysis expired or was evicted, send the full result instead
+            response = client.post("/audio", {"processed_data": processed_data, "language_code": language_code})
+
         if response.status_code == 200:
             return True, response.json()
         else:
-            return False, f"Error: {response.json().get('detail', 'Failed to generate audio')}"
+            return False, f"Error: {_error_detail(response, 'Failed to generate audio')}"
     except Exception as e:
-        return False, f"Connection error: {str(e)}"
\ No newline at end of file
+        return False, f"Connection error: {str(e)}"
+
+def fetch_audio(api_url, audio_id):
+    """
+    Download generated audio by ID
+
+    Parameters:
+    api_url (str): API endpoint URL, or IN_PROCESS_API to read the audio store directly
+    audio_id (str): Audio ID returned by generate_audio_summary
+
+    Returns:
+    tuple: (success (bool), audio bytes/error_message (bytes/str))
+    """
+    if api_url == IN_PROCESS_API:
+        return _fetch_audio_in_process(audio_id)
+
+    try:
+        response = get_api_client(api_url).get(f"/audio/{audio_id}")
+
+        if response.status_code == 200:
+            return True, response.content
+        else:
+            return False, f"Error: {_error_detail(response, 'Failed to load audio')}"
+    except Exception as e:
+        return False, f"Connection error: {str(e)}"
+
+# In-process fast path: run the pipeline synchronously when the UI and the
+# pipeline share a process, without an HTTP hop or a JSON round trip. The
+# async handlers are not used here: each call would need a fresh event loop,
+# with its own HTTP client, and the NLP work would start a process pool
+# inside Streamlit.
+
+def _fetch_news_in_process(company_name, session_id=None):
+    for event in _stream_news_in_process(company_name, session_id):
+        if event["type"] == "analysis":
+            return True, event["processed_data"]
+        if event["type"] == "error":
+            return False, event["detail"]
+    return False, "Error: Failed to retrieve data"
+
+def _stream_news_in_process(company_name, session_id=None):
+    import server
+    from news import get_news_articles
+
+    try:
+        request = server.NewsRequest(company_name=company_name, session_id=session_id)
+        processed_data, analysis_id = server.get_cached_analysis(company_name)
+        news_articles = None
+        if processed_data is None:
+            news_articles = get_news_articles(company_name)
+            if not news_articles:
+                yield {"type": "error", "detail": "Error: No news articles found for this company"}
+                return
+        yield from server.iter_news_events(request, processed_data, news_articles, analysis_id)
+    except Exception as e:
+        yield {"type": "error", "detail": f"Error: {str(e)}"}
+
+def _generate_audio_in_process(processed_data, language_code, analysis_id=None):
+    import server
+
+    # The analysis is already at hand, so analysis_id, which only saves sending it over HTTP, is not needed
+    try:
+        return True, server.render_audio(processed_data, language_code)
+    except Exception as e:
+        return False, f"Error: {str(e)}"
+
+def _fetch_audio_in_process(audio_id):
+    from audio_store import get_audio_store
+    from server import AUDIO_ID_PATTERN
+
+    audio_path = get_audio_store().get(audio_id) if AUDIO_ID_PATTERN.match(audio_id) else None
+    if audio_path is None:
+        return False, "Error: Audio not found"
+    try:
+        with open(audio_path, "rb") as audio_file:
+            return True, audio_file.read()
+    except FileNotFoundError:
+        # Evicted after the lookup
+        return False, "Error: Audio not found"
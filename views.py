@@ -1,17 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils import fetch_news_data, generate_audio_summary
-
-# Dictionary of language codes for audio summary generation
-LANGUAGE_CODES = {
-    "english": {"name": "English", "code": "en-US"},
-    "hindi": {"name": "Hindi", "code": "hi"},
-    "telugu": {"name": "Telugu", "code": "te"},
-    "malayalam": {"name": "Malayalam", "code": "ml"},
-    "tamil": {"name": "Tamil", "code": "ta"},
-    "kannada": {"name": "Kannada", "code": "kn"}
-}
+from utils import stream_news_data, generate_audio_summary, fetch_audio
+from language import translate_verdict, LANGUAGE_CODES
 
 def display_search_view(api_url, set_stage):
     """Display the search interface"""
@@ -29,14 +20,18 @@ def display_search_view(api_url, set_stage):
         # Analyze button
         if st.button("Analyze News", use_container_width=True):
             if company_name:
+                # Render article cards as they arrive, then switch to the full results
                 with st.spinner(f"Analyzing news for {company_name}..."):
-                    success, result = fetch_news_data(api_url, company_name)
-                    if success:
-                        st.session_state.processed_data = result
-                        set_stage("results")
-                        st.rerun()
-                    else:
-                        st.error(result)
+                    for event in stream_news_data(api_url, company_name, st.session_state.get("session_id")):
+                        if event["type"] == "article":
+                            display_article_card(event["article"])
+                        elif event["type"] == "analysis":
+                            st.session_state.processed_data = event["processed_data"]
+                            st.session_state.analysis_id = event.get("analysis_id")
+                            set_stage("results")
+                            st.rerun()
+                        elif event["type"] == "error":
+                            st.error(event["detail"])
             else:
                 st.warning("Please enter a company name")
 
@@ -63,11 +58,18 @@ def display_results_view(set_stage):
         # Create sentiment count cards
         display_sentiment_cards(distribution)
     
-    # Display overall sentiment
+    # Display overall sentiment, rendered from the structured verdict when available
     st.markdown('<div class="sub-title">Overall Analysis</div>', unsafe_allow_html=True)
+    verdict = data.get("Sentiment Verdict")
+    overall_text = translate_verdict(verdict, "en") if verdict else data['Final Sentiment Analysis']
+    scores_text = ""
+    if verdict and verdict["Scores"]["Mean Compound"] is not None:
+        scores = verdict["Scores"]
+        scores_text = f'<p>Average polarity: {scores["Mean Polarity"]:.2f} | Average VADER compound: {scores["Mean Compound"]:.2f}</p>'
     st.markdown(f"""
     <div class="card">
-        <p style="font-size: 18px;">{data['Final Sentiment Analysis']}</p>
+        <p style="font-size: 18px;">{overall_text}</p>
+        {scores_text}
     </div>
     """, unsafe_allow_html=True)
     
@@ -92,17 +94,8 @@ def display_results_view(set_stage):
     # Display news articles
     st.markdown('<div class="sub-title">News Articles</div>', unsafe_allow_html=True)
     
-    for i, article in enumerate(data["Articles"], 1):
-        sentiment_class = f"card sentiment-{article['Sentiment'].lower()}"
-        
-        st.markdown(f"""
-        <div class="{sentiment_class}">
-            <h3>{article['Title']}</h3>
-            <p>{article['Summary']}</p>
-            <p>Sentiment: {article['Sentiment']}</p>
-            <p>Topics: {', '.join(article['Topics'])}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    for article in data["Articles"]:
+        display_article_card(article)
     
     # Button to proceed to language selection
     st.markdown('<div class="button-container">', unsafe_allow_html=True)
@@ -122,6 +115,19 @@ def display_results_view(set_stage):
             st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
+def display_article_card(article):
+    """Display a single news article as a sentiment-colored card"""
+    sentiment_class = f"card sentiment-{article['Sentiment'].lower()}"
+    
+    st.markdown(f"""
+    <div class="{sentiment_class}">
+        <h3>{article['Title']}</h3>
+        <p>{article['Summary']}</p>
+        <p>Sentiment: {article['Sentiment']}</p>
+        <p>Topics: {', '.join(article['Topics'])}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
 def display_language_view(api_url, set_stage):
     """Display the language selection interface"""
     st.markdown('<div class="sub-title">Select Language for Audio Summary</div>', unsafe_allow_html=True)
@@ -139,7 +145,8 @@ def display_language_view(api_url, set_stage):
                     success, result = generate_audio_summary(
                         api_url, 
                         st.session_state.processed_data, 
-                        lang['code']
+                        lang['code'],
+                        st.session_state.get("analysis_id")
                     )
                     
                     if success:
@@ -157,7 +164,8 @@ def display_language_view(api_url, set_stage):
                     success, result = generate_audio_summary(
                         api_url, 
                         st.session_state.processed_data, 
-                        lang['code']
+                        lang['code'],
+                        st.session_state.get("analysis_id")
                     )
                     
                     if success:
@@ -176,18 +184,26 @@ def display_language_view(api_url, set_stage):
             st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
-def display_audio_view(set_stage):
+def display_audio_view(api_url, set_stage):
     """Display the audio player and summary"""
     audio_data = st.session_state.audio_data
     
     st.markdown(f'<div class="sub-title">{audio_data["language_name"]} Audio Summary</div>', unsafe_allow_html=True)
     
-    # Display the audio player
+    # Display the audio player, downloading the audio only the first time it is shown
     st.markdown('<div class="card">', unsafe_allow_html=True)
-    try:
-        st.audio(audio_data["audio_file"], format="audio/mp3")
-    except:
-        st.warning("Audio file is not accessible directly. You may need to download it.")
+    audio_id = audio_data["audio_id"]
+    audio_bytes = st.session_state.audio_bytes
+    success, audio = (True, audio_bytes[audio_id]) if audio_id in audio_bytes else fetch_audio(api_url, audio_id)
+    if success:
+        if audio_id not in audio_bytes:
+            # One entry per language is enough to switch back and forth without downloading again
+            while len(audio_bytes) >= len(LANGUAGE_CODES):
+                del audio_bytes[next(iter(audio_bytes))]
+            audio_bytes[audio_id] = audio
+        st.audio(audio, format="audio/mp3")
+    else:
+        st.warning(f"Audio could not be loaded. {audio}")
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Display the text summary